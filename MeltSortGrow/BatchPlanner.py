@@ -0,0 +1,128 @@
+#Batch planning, for planning many reconfigurations at once across a pool of processes.
+#Results are handed back as each job finishes, so they can be used while the rest are still being planned.
+
+#Import dependencies.
+import argparse
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import ModularRoboticsToolkit as mrt
+import MeltSortGrow as msg
+import PlanCache as pc
+
+#A reconfiguration to plan. Structures can be arrays, sparse structures or the names of files to load them from.
+class PlanningJob():
+
+    def __init__(self, jobID, initialStructure, goalStructure, allignMode='greedy'):
+        self.jobID = jobID
+        self.initialStructure = initialStructure
+        self.goalStructure = goalStructure
+        self.allignMode = allignMode
+
+#The outcome of a job. Status is 'complete', 'timeout' or 'failed', movements are only set when complete.
+#The initial structure is kept with a complete plan, so the plan can be saved with the lattice size and module count.
+class PlanningResult():
+
+    def __init__(self, jobID, status, movements, planningTime, message='', initialStructure=None):
+        self.jobID = jobID
+        self.status = status
+        self.movements = movements
+        self.planningTime = planningTime
+        self.message = message
+        self.initialStructure = initialStructure
+
+#Plan a single job, catching any failure so it is reported rather than stopping the batch.
+#cacheFolder is a folder of plans shared by every process, see PlanCache, None to always plan from scratch.
+def runJob(job, timeLimit=None, cacheFolder=None):
+
+    startTime = time.perf_counter()
+
+    try:
+        initialStructure = job.initialStructure
+        goalStructure = job.goalStructure
+        if isinstance(initialStructure, str):
+            initialStructure = mrt.loadStructure(initialStructure)
+        if isinstance(goalStructure, str):
+            goalStructure = mrt.loadStructure(goalStructure)
+
+        planCache = None
+        if cacheFolder != None:
+            planCache = pc.PlanCache(cacheFolder)
+
+        meltSuccsessful, movements = msg.main(initialStructure, goalStructure, allignMode=job.allignMode, timeLimit=timeLimit, planCache=planCache)
+        return PlanningResult(job.jobID, 'complete', movements, time.perf_counter()-startTime, initialStructure=initialStructure)
+
+    except mrt.PlanningTimeout as e:
+        return PlanningResult(job.jobID, 'timeout', None, time.perf_counter()-startTime, str(e))
+    except Exception as e:
+        return PlanningResult(job.jobID, 'failed', None, time.perf_counter()-startTime, traceback.format_exc())
+
+#Plan a shard of jobs in one worker, so small jobs do not each pay for a trip to the pool.
+def runShard(jobs, timeLimit=None, cacheFolder=None):
+    return [runJob(job, timeLimit, cacheFolder) for job in jobs]
+
+#Plan every job across a pool of processes, yielding each result as soon as its shard is finished.
+#noOfWorkers defaults to the number of cores, timeLimit is in seconds per job.
+def planBatch(jobs, noOfWorkers=None, timeLimit=None, shardSize=1, cacheFolder=None):
+
+    jobs = list(jobs)
+    shards = [jobs[i:i+shardSize] for i in range(0, len(jobs), shardSize)]
+
+    with ProcessPoolExecutor(max_workers=noOfWorkers) as executor:
+        futures = [executor.submit(runShard, shard, timeLimit, cacheFolder) for shard in shards]
+        for future in as_completed(futures):
+            for result in future.result():
+                yield result
+
+#Read a list of jobs from a text file, each line is a job ID followed by the initial and goal structure files.
+#Relative file names are taken from the folder the job list is in.
+def loadJobList(filePath, allignMode='greedy'):
+
+    folder = os.path.dirname(os.path.abspath(filePath))
+    jobs = []
+
+    with open(filePath) as jobList:
+        for line in jobList:
+            line = line.split('#')[0].split()
+            if len(line) == 0:
+                continue
+            jobID, initialFile, goalFile = line
+            jobs.append(PlanningJob(jobID, os.path.join(folder, initialFile), os.path.join(folder, goalFile), allignMode))
+
+    return jobs
+
+#Command line entry point.
+def main(arguments=None):
+
+    parser = argparse.ArgumentParser(description='Plan a batch of Melt Sort Grow reconfigurations in parallel.')
+    parser.add_argument('jobList', help='text file with a job ID, initial structure file and goal structure file per line')
+    parser.add_argument('planFolder', help='folder to write each plan to, named by job ID')
+    parser.add_argument('--workers', type=int, default=None, help='number of processes (default: one per core)')
+    parser.add_argument('--time-limit', type=float, default=None, help='seconds each job can take')
+    parser.add_argument('--shard-size', type=int, default=1, help='jobs given to a process at a time')
+    parser.add_argument('--allign', default='greedy', choices=['greedy', 'optimal'])
+    parser.add_argument('--binary', action='store_true', help='write each plan as a binary .plan file rather than text')
+    parser.add_argument('--cache', default=None, help='folder to keep plans in, so repeated plans are not planned again')
+    arguments = parser.parse_args(arguments)
+
+    os.makedirs(arguments.planFolder, exist_ok=True)
+    planExtension = '.plan' if arguments.binary == True else '.txt'
+    jobs = loadJobList(arguments.jobList, arguments.allign)
+
+    startTime = time.perf_counter()
+    noComplete = 0
+    for result in planBatch(jobs, arguments.workers, arguments.time_limit, arguments.shard_size, arguments.cache):
+
+        if result.status == 'complete':
+            mrt.savePlan(os.path.join(arguments.planFolder, str(result.jobID) + planExtension), result.movements, result.initialStructure)
+            noComplete += 1
+            print(str(result.jobID) + ' complete ' + result.movements.legnth(string=True) + ' movements ' + '%.3f' % result.planningTime + 's')
+        else:
+            print(str(result.jobID) + ' ' + result.status + ' ' + '%.3f' % result.planningTime + 's ' + result.message.strip().split('\n')[-1])
+
+    totalTime = time.perf_counter() - startTime
+    print(str(noComplete) + '/' + str(len(jobs)) + ' jobs complete in ' + '%.3f' % totalTime + 's')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,190 @@
+#Benchmarking of the planner, measuring how each phase scales with the size of the lattice and the number of modules.
+#Results are written as JSON and can be compared against a stored baseline, so a change to the planner that makes a
+#phase slower, use more memory or make more movements is flagged rather than noticed later.
+
+#Import dependencies.
+import argparse
+import json
+import platform
+import sys
+import tracemalloc
+import numpy as np
+import MeltSortGrow as msg
+import StructGen as sg
+
+#Changed whenever the results are written differently, so older baselines are not compared against.
+resultsVersion = 1
+
+#The phases of a plan, in the order they are made.
+phases = ['meltInitial', 'meltGoal', 'allign', 'sort', 'flip', 'combine']
+
+#Make a phase hook that measures the peak memory of each top level phase, while tracemalloc is tracing.
+#Nested phases are left alone, as resetting the peak inside a phase would lose the peak of the phase around it.
+def getPeakMemoryHook(peakMemory):
+
+    startMemory = {}
+
+    def measurePeakMemory(event, path, stats):
+        if '/' in path or tracemalloc.is_tracing() == False:
+            return
+        if event == 'start':
+            startMemory[path] = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        else:
+            peakMemory[path] = tracemalloc.get_traced_memory()[1] - startMemory[path]
+
+    return measurePeakMemory
+
+#Plan a reconfiguration, returning the movements and the wall time, peak memory and movements of each phase.
+#Times and movements come from the stats MeltSortGrow.main keeps, peak memory is only measured while tracemalloc is tracing.
+def planInPhases(initialStructure, goalStructure, widthOfLattice, allignMode='greedy'):
+
+    peakMemory = {}
+    meltSuccsessful, movements = msg.main(initialStructure, goalStructure, widthOfLattice, allignMode, phaseHook=getPeakMemoryHook(peakMemory))
+    phaseStats = movements.getStats().getSummary()['phases']
+
+    measurements = {}
+    for phase in phases:
+        measurements[phase] = {'time': phaseStats[phase]['time'], 'peakMemory': peakMemory.get(phase),
+            'movements': phaseStats[phase]['movements']}
+
+    return movements, measurements
+
+#Benchmark every pair of structures of a kind and size, generated the same way as StructGen.generateCorpus.
+#Each pair is planned repeats times and the fastest time of each phase is kept, then once more tracing memory.
+#Returns the mean time and movements of each phase over the pairs, and the largest peak memory.
+def benchmarkSize(kind, widthOfLattice, noOfModules, noOfPairs=3, repeats=3, seed=0, allignMode='greedy'):
+
+    totals = {phase: {'time': 0.0, 'peakMemory': 0, 'movements': 0} for phase in phases}
+
+    for pairNo in range(noOfPairs):
+        pairSeed = (seed, widthOfLattice, noOfModules, list(sg.kinds).index(kind), pairNo)
+        initialStructure, goalStructure = sg.generatePair(kind, noOfModules, widthOfLattice, pairSeed)
+
+        bestTimes = {phase: None for phase in phases}
+        for repeatNo in range(repeats):
+            movements, measurements = planInPhases(initialStructure, goalStructure, widthOfLattice, allignMode)
+            for phase in phases:
+                if bestTimes[phase] == None or measurements[phase]['time'] < bestTimes[phase]:
+                    bestTimes[phase] = measurements[phase]['time']
+
+        tracemalloc.start()
+        try:
+            movements, measurements = planInPhases(initialStructure, goalStructure, widthOfLattice, allignMode)
+        finally:
+            tracemalloc.stop()
+
+        for phase in phases:
+            totals[phase]['time'] += bestTimes[phase]
+            totals[phase]['peakMemory'] = max(totals[phase]['peakMemory'], measurements[phase]['peakMemory'])
+            totals[phase]['movements'] += measurements[phase]['movements']
+
+    results = {phase: {'time': totals[phase]['time'] / noOfPairs, 'peakMemory': totals[phase]['peakMemory'],
+        'movements': totals[phase]['movements'] / noOfPairs} for phase in phases}
+    results['total'] = {'time': sum(results[phase]['time'] for phase in phases),
+        'peakMemory': max(results[phase]['peakMemory'] for phase in phases),
+        'movements': sum(results[phase]['movements'] for phase in phases)}
+
+    return results
+
+#Benchmark a sweep of sizes, each a (lattice width, number of modules) pair, for every kind of structure.
+#listener is called with each result as it is made, so progress can be shown.
+def runBenchmark(sizes, kindNames=None, noOfPairs=3, repeats=3, seed=0, allignMode='greedy', listener=None):
+
+    if kindNames == None:
+        kindNames = list(sg.kinds)
+
+    results = []
+    for widthOfLattice, noOfModules in sizes:
+        for kind in kindNames:
+            result = {'kind': kind, 'widthOfLattice': widthOfLattice, 'noOfModules': noOfModules,
+                'phases': benchmarkSize(kind, widthOfLattice, noOfModules, noOfPairs, repeats, seed, allignMode)}
+            results.append(result)
+            if listener != None:
+                listener(result)
+
+    return {'version': resultsVersion, 'python': platform.python_version(), 'numpy': np.__version__,
+        'machine': platform.machine(), 'pairs': noOfPairs, 'repeats': repeats, 'seed': seed,
+        'allignMode': allignMode, 'results': results}
+
+#Compare results against a baseline, returning a message for every phase that has got worse.
+#Times and peak memory can grow by a fraction of the baseline before being flagged, and by at least minTime seconds
+#or minMemory bytes, so noise in very short or small phases is not flagged. Plans are deterministic, so any extra movement is flagged.
+def findRegressions(results, baseline, tolerance=0.25, minTime=0.001, minMemory=4096):
+
+    if baseline.get('version') != resultsVersion:
+        raise ValueError('The baseline was written by a different version of the benchmark')
+
+    baselineResults = {(result['kind'], result['widthOfLattice'], result['noOfModules']): result['phases'] for result in baseline['results']}
+
+    regressions = []
+    for result in results['results']:
+        size = (result['kind'], result['widthOfLattice'], result['noOfModules'])
+        if size not in baselineResults:
+            continue
+        name = result['kind'] + ' w' + str(result['widthOfLattice']) + ' n' + str(result['noOfModules'])
+
+        for phase in phases + ['total']:
+            new = result['phases'][phase]
+            old = baselineResults[size][phase]
+
+            if new['time'] > old['time'] * (1 + tolerance) and new['time'] - old['time'] > minTime:
+                regressions.append(name + ' ' + phase + ' time ' + '%.4f' % old['time'] + 's -> ' + '%.4f' % new['time'] + 's')
+            if new['peakMemory'] > old['peakMemory'] * (1 + tolerance) and new['peakMemory'] - old['peakMemory'] > minMemory:
+                regressions.append(name + ' ' + phase + ' peak memory ' + str(old['peakMemory']) + ' -> ' + str(new['peakMemory']) + ' bytes')
+            if new['movements'] > old['movements']:
+                regressions.append(name + ' ' + phase + ' movements ' + str(old['movements']) + ' -> ' + str(new['movements']))
+
+    return regressions
+
+#Print a line for a result, with the time, peak memory and movements of each phase.
+def printResult(result):
+
+    line = result['kind'].ljust(6) + ' w' + str(result['widthOfLattice']).ljust(4) + ' n' + str(result['noOfModules']).ljust(5)
+    for phase in phases + ['total']:
+        measurements = result['phases'][phase]
+        line += ' ' + phase + ' ' + '%.4f' % measurements['time'] + 's/' + '%.0f' % (measurements['peakMemory'] / 1024) + 'KiB/' + '%g' % measurements['movements']
+    print(line)
+
+#Command line entry point, returns 1 if any regressions are found against the baseline and 0 otherwise.
+def main(arguments=None):
+
+    parser = argparse.ArgumentParser(description='Measure how each phase of Melt Sort Grow scales with the size of the reconfiguration.')
+    parser.add_argument('--widths', type=int, nargs='+', default=[10, 20, 40, 80], help='lattice widths')
+    parser.add_argument('--modules', type=int, nargs='+', default=None,
+        help='numbers of modules, each used with every width it fits in (default: the width of the lattice)')
+    parser.add_argument('--kinds', nargs='+', default=list(sg.kinds), choices=list(sg.kinds))
+    parser.add_argument('--pairs', type=int, default=3, help='pairs of structures of each kind and size')
+    parser.add_argument('--repeats', type=int, default=3, help='times each pair is planned, the fastest is kept')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--allign', default='greedy', choices=['greedy', 'optimal'])
+    parser.add_argument('--output', default=None, help='JSON file to write the results to')
+    parser.add_argument('--baseline', default=None, help='JSON results to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='fraction a time or peak memory can grow by before it is flagged')
+    arguments = parser.parse_args(arguments)
+
+    if arguments.modules == None:
+        sizes = [(width, width) for width in arguments.widths]
+    else:
+        sizes = [(width, modules) for width in arguments.widths for modules in arguments.modules if modules <= width]
+
+    results = runBenchmark(sizes, arguments.kinds, arguments.pairs, arguments.repeats, arguments.seed, arguments.allign, printResult)
+
+    if arguments.output != None:
+        with open(arguments.output, 'w') as file:
+            json.dump(results, file, indent=1)
+
+    if arguments.baseline != None:
+        with open(arguments.baseline) as file:
+            baseline = json.load(file)
+        regressions = findRegressions(results, baseline, arguments.tolerance)
+        for regression in regressions:
+            print('Regression: ' + regression)
+        print(str(len(regressions)) + ' regressions against ' + arguments.baseline)
+        if len(regressions) > 0:
+            return 1
+
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
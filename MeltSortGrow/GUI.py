@@ -3,15 +3,34 @@ from functools import total_ordering
 import tkinter as tk
 from matplotlib.backends.backend_tkagg import (FigureCanvasTkAgg, NavigationToolbar2Tk)
 from matplotlib.figure import Figure
+from matplotlib.colors import to_rgba
 from numpy.core.numeric import moveaxis, tensordot
 import ModularRoboticsToolkit as mrt
 import StructMaker as sm
 import MeltSortGrow as msg
 import numpy as np
 
-#Tk setup + window name.
-root = tk.Tk()
-root.wm_title('Modular System ReConfig Planner')
+#Tk root window, created when the GUI is started rather than when this is imported.
+root = None
+
+#Colour of each module ID as RGBA, see mrt.colours, index 0 is the clear colour of empty voxels.
+moduleColours = np.array([to_rgba('white', alpha=0)] + [to_rgba(mrt.colours[i]) for i in sorted(mrt.colours)])
+
+#Get the colour of every voxel in a structure, IDs past the last colour go round the colours again.
+def getColourArray(structure):
+
+    colourIndex = np.where(structure != 0, (structure.astype(np.int64) - 1) % (len(moduleColours) - 1) + 1, 0)
+    return moduleColours[colourIndex]
+
+#Get a mask grown by one voxel in every direction, so it also covers the voxels sharing a face with it.
+def growRegion(mask):
+
+    region = np.copy(mask)
+    for axis in range(3):
+        region[(slice(None),)*axis + (slice(1, None),)] |= mask[(slice(None),)*axis + (slice(None, -1),)]
+        region[(slice(None),)*axis + (slice(None, -1),)] |= mask[(slice(None),)*axis + (slice(1, None),)]
+
+    return region
 
 #A display holds a single mpl plot and one of the 3 arrays used to store structures.
 class Display():
@@ -23,6 +42,7 @@ class Display():
         self.stepCounter = 0
         self.displayChanged = False
         self.movements = []
+        self.stepSlider = None
 
         #Setup voxel plot.
         self.fig = Figure(figsize=(6, 6), dpi=100)
@@ -37,6 +57,18 @@ class Display():
         #Add the structure to the voxel plot.
         self.ax = self.fig.add_subplot(111, projection='3d')
 
+        #The structure as it is drawn and the mpl artist drawing each voxel, so only changed voxels need redrawing.
+        self.drawnStructure = None
+        self.voxelArtists = {}
+
+    #Show the whole lattice, so the view stays still as voxels are redrawn.
+    def setLimits(self):
+
+        shape = np.shape(self.drawnStructure)
+        self.ax.set_xlim(0, shape[0])
+        self.ax.set_ylim(0, shape[1])
+        self.ax.set_zlim(0, shape[2])
+
     #Get/Set for display changed. Used to stop algorithms running before structures are created.
     def isDisplayChanged(self):
         return self.displayChanged
@@ -50,12 +82,54 @@ class Display():
         self.structure = structure
         self.ax.clear()
 
-        #Draw voxel by voxel, checking the colours of each voxel. 
-        for voxel in np.nditer(self.structure):
-            if voxel != 0:
-                colourForAssignment = mrt.getColourOfModule(int(voxel))
-                array = mrt.getSingleArray(structure, voxel)
-                self.ax.voxels(array, edgecolors='k', color=colourForAssignment)
+        #Draw every voxel in one go, coloured by module ID.
+        structure = mrt.getDenseStructure(structure)
+        self.voxelArtists = self.ax.voxels(structure != 0, facecolors=getColourArray(structure), edgecolors='k')
+        self.drawnStructure = np.copy(structure)
+        self.setLimits()
+
+        #Draw changes to the screen and set the changed indicator.
+        self.fig.canvas.draw()
+        self.displayChanged = True
+
+    #Draw a structure that is a step on from the one drawn, redrawing only the voxels that have changed.
+    def updateStructure(self, structure):
+
+        denseStructure = mrt.getDenseStructure(structure)
+        if self.drawnStructure is None or np.shape(denseStructure) != np.shape(self.drawnStructure):
+            self.overwriteStructure(structure)
+            return
+
+        self.structure = structure
+        changed = denseStructure != self.drawnStructure
+
+        #Faces between voxels are not drawn, so the voxels next to a changed one are redrawn to show or hide theirs.
+        region = growRegion(changed)
+
+        for voxel in np.argwhere(region):
+            artist = self.voxelArtists.pop(tuple(voxel), None)
+            if artist != None:
+                artist.remove()
+
+        #The voxels around the region are drawn with it so their shared faces are hidden, then only the region is kept.
+        #Only the box around them is passed to voxels, with the corners of its voxels placed where they are in the lattice,
+        #so moving one module costs a draw of a few voxels rather than the whole lattice.
+        grownRegion = growRegion(region)
+        if np.any(region & (denseStructure != 0)):
+            occupied = np.argwhere(grownRegion)
+            start = occupied.min(axis=0)
+            box = tuple(slice(first, last + 1) for first, last in zip(start, occupied.max(axis=0)))
+            filled = grownRegion[box] & (denseStructure[box] != 0)
+            corners = np.indices(np.array(filled.shape) + 1) + start.reshape(3, 1, 1, 1)
+            boxArtists = self.ax.voxels(*corners, filled, facecolors=getColourArray(denseStructure[box]), edgecolors='k')
+            for voxel, artist in boxArtists.items():
+                voxel = tuple(int(i) for i in np.add(voxel, start))
+                if region[voxel] == True:
+                    self.voxelArtists[voxel] = artist
+                else:
+                    artist.remove()
+        self.drawnStructure = np.copy(denseStructure)
+        self.setLimits()
 
         #Draw changes to the screen and set the changed indicator.
         self.fig.canvas.draw()
@@ -68,6 +142,10 @@ class Display():
         self.steppableStructure = steppableStructure
     def getSteppableStructure(self):
         return self.steppableStructure
+    def setStepSlider(self, stepSlider):
+        self.stepSlider = stepSlider
+    def getStepSlider(self):
+        return self.stepSlider
 
 #Setup the output box in the lower left corner of the screen.
 class OutputFrame():
@@ -129,6 +207,12 @@ def controlsInit(initialStructureDisplay, goalStructureDisplay, interimStructure
             command=lambda: nextTwoButtonPress(interimStructureDisplay, outputBox))
     nextTwoButton.grid(row=0, column=5)
 
+    #Slider to jump to any step of the plan.
+    stepSlider = tk.Scale(master=controlFrameCentral, from_=0, to=0, orient=tk.HORIZONTAL, showvalue=False, length=300,
+            command=lambda value: stepSliderMove(interimStructureDisplay, outputBox, int(float(value))))
+    stepSlider.grid(row=1, column=0, columnspan=6)
+    interimStructureDisplay.setStepSlider(stepSlider)
+
     controlFrameCentral.grid(row=3, column=1)
 
     controlFrameLeft = tk.Frame(master=root)
@@ -158,17 +242,19 @@ def MSGButtonPress(initialStructureDisplay, goalStructureDisplay, interimStructu
         #Display the initial structure in the middle box.
         interimStructureDisplay.overwriteStructure(initialStructureDisplay.getStructureAsArray())
 
-        #Setter for the default lattice width.
-        widthOfLattice = 10
+        #The lattice width is taken from the structure that has been drawn.
+        widthOfLattice = np.shape(initialStructureDisplay.getStructureAsArray())[0]
 
         #Create a new structure, to protect the original within this program.
-        initialStructureForManipulation = np.zeros((widthOfLattice, widthOfLattice, widthOfLattice))
-        for voxel in np.nditer(initialStructureDisplay.getStructureAsArray()):
-            if voxel != 0:
-                initialStructureForManipulation[np.where(initialStructureDisplay.getStructureAsArray()==voxel)] = voxel
+        initialStructureForManipulation = np.copy(initialStructureDisplay.getStructureAsArray())
 
         #Send the new structure to be Melted, Sorted and Grown.
-        meltSuccsessful, movements = msg.main(initialStructureForManipulation, goalStructureDisplay.getStructureAsArray())
+        #Structures the planner cannot use, such as ones with two modules of the same ID, are reported rather than planned.
+        try:
+            meltSuccsessful, movements = msg.main(initialStructureForManipulation, goalStructureDisplay.getStructureAsArray(), widthOfLattice)
+        except ValueError as e:
+            outputBox.displayMessage('Error! ' + str(e))
+            return
 
         #Use the returned movements to create the steppable structure. 
         steppableStructure = mrt.StepStructure(initialStructureDisplay.getStructureAsArray(), movements)
@@ -179,6 +265,10 @@ def MSGButtonPress(initialStructureDisplay, goalStructureDisplay, interimStructu
         #Set the steppable structure in the diusplay object for easy, global access. 
         interimStructureDisplay.setSteppableStructure(steppableStructure)
 
+        #Let the slider reach every step of the new plan.
+        interimStructureDisplay.getStepSlider().configure(to=movements.legnth())
+        interimStructureDisplay.getStepSlider().set(0)
+
         #Display suitable message.
         if meltSuccsessful == True:
             outputBox.displayMessage('Melt Sort Grow Complete!')
@@ -234,7 +324,8 @@ def nextButtonPress(interimStructureDisplay, outputBox):
     if stepComplete == False: return
 
     #Display a suitable message and the new structure.
-    interimStructureDisplay.overwriteStructure(steppableStructure.getStructure())
+    interimStructureDisplay.updateStructure(steppableStructure.getStructure())
+    interimStructureDisplay.getStepSlider().set(steppableStructure.step)
     outputBox.displayMessage(message)
 
 #Display the previous step when the button is pressed.
@@ -254,9 +345,28 @@ def previousButtonPress(interimStructureDisplay, outputBox):
     if stepComplete == False: return
 
         #Display a suitable message and the new structure.
-    interimStructureDisplay.overwriteStructure(steppableStructure.getStructure())
+    interimStructureDisplay.updateStructure(steppableStructure.getStructure())
+    interimStructureDisplay.getStepSlider().set(steppableStructure.step)
     outputBox.displayMessage(message)
 
+#Jump to the step the slider has been moved to.
+def stepSliderMove(interimStructureDisplay, outputBox, stepNo):
+
+    #The slider can be moved before a reconfiguration has been run, there is nothing to show until then.
+    try:
+        steppableStructure = interimStructureDisplay.getSteppableStructure()
+    except:
+        return
+
+    #The slider is also set when the buttons move a step, which needs no redraw.
+    if stepNo == steppableStructure.step: return
+
+    steppableStructure.seek(stepNo)
+
+    #Display a suitable message and the new structure.
+    interimStructureDisplay.updateStructure(steppableStructure.getStructure())
+    outputBox.displayMessage(steppableStructure.getMessage())
+
 #If the double move back button is pressed, run the move back function three times. 
 def previousTwoButtonPress(interimStructureDisplay, outputBox):
 
@@ -287,6 +397,11 @@ def titleBarInit():
 
 #Main loop to start the GUI and the entire program. 
 def main():
+
+    #Tk setup + window name.
+    global root
+    root = tk.Tk()
+    root.wm_title('Modular System ReConfig Planner')
     
     #Setup the three voxel plots.
     initialStructureDisplay = Display(0)
@@ -303,5 +418,6 @@ def main():
     #Start the Tk mainloop, to listen for button presses.
     tk.mainloop()
 
-#GUI is the entry point to the program.
-main()
+#GUI is the entry point to the program, when run by itself.
+if __name__ == '__main__':
+    main()
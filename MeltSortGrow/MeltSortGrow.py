@@ -1,7 +1,13 @@
 #Import dependencies.
 import numpy as np
 import ModularRoboticsToolkit as mrt
+import PlanCache as pc
+import Symmetry as sym
 import sys
+import time
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
 
 
 ################
@@ -9,156 +15,301 @@ import sys
 ################
 
 
-#Find the most populated line in the structure, so modules can be appended to it.
-def findMeltCoordinates(structure):
+#Counts the modules along every line of the lattice, as seen from each axis, and keeps the counts up to date as modules move.
+#Answers which line is longest and whether the melt is complete without recounting the whole structure.
+class LineCounter():
 
-    #Count how many modules are behind a face of voxels.
-    zArray = np.count_nonzero(structure, axis=0)
-    xArray = np.count_nonzero(structure, axis=1)
-    yArray = np.count_nonzero(structure, axis=2)
-
-    #Get the largest row of modules from each axis.
-    zArrayMax = np.amax(zArray)
-    xArrayMax = np.amax(xArray)
-    yArrayMax = np.amax(yArray)
-
-    #Find the largest row of modules. Set axis and array values accordingly.
-    if zArrayMax > xArrayMax and zArrayMax > yArrayMax:
-        axis = 0
-        axisArray = zArray
-    elif xArrayMax > zArrayMax and xArrayMax > yArrayMax:
-        axis = 1
-        axisArray = xArray
-    else:
-        axis = 2
-        axisArray = yArray
+    #Initialise with a structure, counting it once.
+    def __init__(self, structure):
+
+        #One 2D table of counts per axis, each entry is the number of modules on a line parallel to that axis.
+        self.counts = [mrt.countLines(structure, axis=axis) for axis in range(3)]
+        self.totalModules = int(mrt.countModules(structure))
+        self.countFullLines()
+
+    #Count the lines which hold every module, only needed when the number of modules changes.
+    def countFullLines(self):
+        self.fullLines = sum(int(np.count_nonzero(counts == self.totalModules)) for counts in self.counts)
+
+    #Add or remove a module from the three lines that pass through a location.
+    def changeCount(self, location, change):
+
+        for axis in range(3):
+            line = tuple(location[i] for i in range(3) if i != axis)
+            oldCount = self.counts[axis][line]
+            self.counts[axis][line] = oldCount + change
+
+            #Keep track of lines becoming, or no longer being, full.
+            if oldCount == self.totalModules:
+                self.fullLines -= 1
+            if oldCount + change == self.totalModules:
+                self.fullLines += 1
+
+    #Update the counts for a module moving, None as a location is the hold.
+    def moveModule(self, oldLocation, newLocation):
+
+        if oldLocation != None:
+            self.changeCount(oldLocation, -1)
+        if newLocation != None:
+            self.changeCount(newLocation, 1)
+
+        #Modules entering or leaving the hold change how many modules a full line needs.
+        if oldLocation == None:
+            self.totalModules += 1
+        if newLocation == None:
+            self.totalModules -= 1
+        if oldLocation == None or newLocation == None:
+            self.countFullLines()
+
+    #Are all modules in one line.
+    def isMeltComplete(self):
+        return self.fullLines > 0
+
+    #Get the axis of the longest line and the counts along that axis.
+    def getLongestAxis(self):
+
+        #Get the largest row of modules from each axis.
+        zArrayMax = np.amax(self.counts[0])
+        xArrayMax = np.amax(self.counts[1])
+        yArrayMax = np.amax(self.counts[2])
+
+        #Find the largest row of modules. Set axis accordingly.
+        if zArrayMax > xArrayMax and zArrayMax > yArrayMax:
+            return 0
+        elif xArrayMax > zArrayMax and xArrayMax > yArrayMax:
+            return 1
+        else:
+            return 2
+
+    #Get the number of modules in the longest line.
+    def getLongestLine(self):
+        return int(np.amax(self.counts[self.getLongestAxis()]))
+
+    #Get the coordinates of the most populated line, with 'm' representing the line along which to melt.
+    def getMeltCoordinates(self):
+
+        axis = self.getLongestAxis()
+        axisArray = self.counts[axis]
 
-    #Get 2D coordinates of the Melt Line. 
-    optimalCoordinates = np.unravel_index(axisArray.argmax(), axisArray.shape)
+        #Get 2D coordinates of the Melt Line. 
+        optimalCoordinates = np.unravel_index(axisArray.argmax(), axisArray.shape)
 
-    #Convert 2D coordinates to 3D coordinates, with 'm' representing the line along which to melt.
-    if axis == 0:
-        meltCoordinates = mrt.Location('m', optimalCoordinates[0], optimalCoordinates[1])
-    elif axis == 1:
-        meltCoordinates = mrt.Location(optimalCoordinates[0], 'm', optimalCoordinates[1])
-    elif axis == 2:
-        meltCoordinates = mrt.Location(optimalCoordinates[0], optimalCoordinates[1], 'm')
+        #Convert 2D coordinates to 3D coordinates.
+        if axis == 0:
+            meltCoordinates = mrt.Location('m', optimalCoordinates[0], optimalCoordinates[1])
+        elif axis == 1:
+            meltCoordinates = mrt.Location(optimalCoordinates[0], 'm', optimalCoordinates[1])
+        elif axis == 2:
+            meltCoordinates = mrt.Location(optimalCoordinates[0], optimalCoordinates[1], 'm')
 
-    #Return the melt coordinates to the main program. 
-    return meltCoordinates
+        return meltCoordinates
+
+#Find the most populated line in the structure, so modules can be appended to it.
+def findMeltCoordinates(structure):
+
+    #Count how many modules are behind a face of voxels and take the best line.
+    return LineCounter(structure).getMeltCoordinates()
 
 #Melt a structure along a predetermined melt line.
 def melt(structure, meltCoordinates, movements):
 
-    #Run while melt is incomplete.
-    meltComplete = isMeltComplete(structure)
-    while meltComplete == False:
+    stats = movements.getStats()
 
-        #Reset distances and line limiters for every sweep.
-        dist = 0
-        largestDist = 0
-        startOfLine = getStartOfLine(structure, meltCoordinates)
-        endOfLine= getEndOfLine(structure, meltCoordinates)
-
-        #Check every voxel, find the one to move.
-        for voxel in np.nditer(structure):
-
-                #Check if a module exists in the voxel, if it does check it is not in line.
-                if voxel != 0 and isModuleIn(getMeltLine(structure, meltCoordinates), voxel) == False:
-
-                    #Find out which end of the line is closest and store the distance
-                    distFromStart = abs(np.linalg.norm(np.argwhere(structure==voxel)-startOfLine.getArray()))
-                    distFromEnd = abs(np.linalg.norm(np.argwhere(structure==voxel)-endOfLine.getArray()))
-                    if distFromEnd > distFromStart:
-                        dist = distFromStart
-                        targetSpace = startOfLine
-                    else:
-                        dist = distFromEnd
-                        targetSpace = endOfLine
-
-                    #Find the closest gap for comparason.
-                    if gapsExist(structure, meltCoordinates) == True:
-
-                        #Find the start and ends of the melt line. 
-                        meltLine = getMeltLine(structure, meltCoordinates)
-                        startOfMeltLine, endOfMeltLine = getStartEndOfMeltLine(meltLine)
-                        gaps = []
-
-                        #Create a list of gaps in the melt line. 
-                        counter = startOfMeltLine
-                        while counter <= endOfMeltLine:
-                            if meltLine[counter] == 0:
-                                gaps.append(counter)
-                            counter += 1
-
-                        #For every gap we found calculate a distance and take the smallest.
-                        for gap in gaps:
-
-                            gapCoordinates = getPointOnMeltLine(gap, meltCoordinates)
-                            distFromGap = abs(np.linalg.norm(np.argwhere(structure==voxel)-gapCoordinates.getArray()))
-
-                            if distFromGap < dist:
-                                dist = distFromGap
-                                targetSpace = gapCoordinates
-
-                    #Compare the distance from the start, end and gap, take the largest.
-                    if dist > largestDist:
-                        largestDist = dist
-                        space = targetSpace
-                        moduleToMoveID = int(voxel)
-
-        #Move the module in the array.
-        currentLocation = np.argwhere(structure==moduleToMoveID)
-        structure[currentLocation[0,0], currentLocation[0,1], currentLocation[0,2]] = 0
-        structure[space.z, space.x, space.y] = moduleToMoveID
-        currentLocation = mrt.Location(currentLocation[0,0], currentLocation[0,1], currentLocation[0,2])
-
-        #Store the movement.
-        movements.storeMovement(structure, moduleToMoveID)
-
-        #Recheck to see if the melt is complete.
-        meltComplete = isMeltComplete(structure)
-
-    #The shuffle function which checks for gaps in the melted line and fills them.
-    while gapsExist(structure, meltCoordinates) == True:
-
-            #Get up to date locations and data.
-            meltLine = getMeltLine(structure, meltCoordinates)
-            startOfLineLocation, endOfLineLocation = getStartEndOfMeltLine(meltLine)
-            
-            #Set the counter at the start of the line, so the spaces before the line begins are not picked up.
-            counter = int(startOfLineLocation)
-        
-            #Stop at the end of the line so that spaces after the line finishes are not picked up.
-            while counter <= endOfLineLocation:
-
-                meltLine = getMeltLine(structure, meltCoordinates)
-
-                #If there is no ID present in the voxel being searched - we have found a gap.
-                if meltLine[counter] == 0:
-
-                    #If gap is closest to the start of the line move the module from the start of the line to the gap.
-                    if (counter-startOfLineLocation) < (endOfLineLocation-startOfLineLocation)/2:
-                        #Move from the start of the line to the gap.
-                        meltLine[counter] = meltLine[startOfLineLocation]
-                        meltLine[startOfLineLocation] = 0
-
-                    else:
-                        #Visa Versa - see above comments.
-                        meltLine[counter] = meltLine[endOfLineLocation]
-                        meltLine[endOfLineLocation] = 0
-
-                    #Reset counter and locations as things have changed.
-                    structure = writeMeltLine(structure, meltCoordinates, meltLine)
-                    movements.storeMovement(structure, int(meltLine[counter]))
-                    break
-
-                #Increment the counter by one and search the next space.
-                counter += 1
+    #Index the modules once, so they can be found without searching the lattice.
+    index = mrt.ModuleIndex(structure)
+
+    #Keep every module's coordinates in one array, so all of them can be compared at once.
+    moduleIDs = np.array(index.getModules(), dtype=np.int64)
+    coordinates = np.array([index.getTuple(moduleID) for moduleID in moduleIDs], dtype=np.int64).reshape(-1, 3)
+
+    #Count the lines once, the counts are updated as modules move.
+    lineCounter = LineCounter(structure)
+    #The index and the line counts each scan the whole lattice once.
+    stats.count('latticeScans', 2)
+
+    with stats.phase('sweep', movements):
+
+        #Run while melt is incomplete.
+        meltComplete = lineCounter.isMeltComplete()
+        while meltComplete == False:
+
+            #Find the module to move and the space to move it to.
+            row, space = findModuleToMelt(structure, meltCoordinates, coordinates)
+
+            #Move the module in the array, the index and the line counts, and store the movement.
+            moveModule(structure, index, moduleIDs[row], space.getTuple(), movements)
+            lineCounter.moveModule(tuple(coordinates[row]), space.getTuple())
+            coordinates[row] = space.getTuple()
+            stats.count('meltSweeps')
+
+            #Recheck to see if the melt is complete.
+            meltComplete = lineCounter.isMeltComplete()
+
+    #The shuffle function which checks for gaps in the melted line and fills them, in a single pass.
+    with stats.phase('compactMeltLine', movements):
+        if gapsExist(structure, meltCoordinates) == True:
+
+            meltLine, shuffles = compactMeltLine(getMeltLine(structure, meltCoordinates))
+            stats.count('shuffles', len(shuffles))
+
+            #Write the compacted line once and store every shuffle together.
+            structure = writeMeltLine(structure, meltCoordinates, meltLine)
+            movements.storeMovementBatch([shuffle[0] for shuffle in shuffles],
+                [getPointOnMeltLine(shuffle[1], meltCoordinates).getTuple() for shuffle in shuffles],
+                [getPointOnMeltLine(shuffle[2], meltCoordinates).getTuple() for shuffle in shuffles])
 
     #When the while loops have both been completed, return the new structure. 
     return structure
 
+#Fill the gaps in a melt line by moving modules from the ends of the line into them.
+#Each gap, from the start of the line, is filled from whichever end it is closest to.
+#Returns the compacted line and a list of (module ID, old position, new position) for each shuffle.
+def compactMeltLine(meltLine):
+
+    meltLine = np.array(meltLine)
+    shuffles = []
+    startOfLineLocation, endOfLineLocation = getStartEndOfMeltLine(meltLine)
+
+    #Everything before the counter is always filled, so the line is only passed over once.
+    counter = startOfLineLocation
+    while True:
+
+        #Find the next gap, stop when the end of the line is reached.
+        while counter <= endOfLineLocation and meltLine[counter] != 0:
+            counter += 1
+        if counter > endOfLineLocation:
+            break
+
+        #If gap is closest to the start of the line move the module from the start of the line to the gap.
+        if 2*(counter-startOfLineLocation) < endOfLineLocation-startOfLineLocation:
+            shuffles.append((int(meltLine[startOfLineLocation]), startOfLineLocation, counter))
+            meltLine[counter] = meltLine[startOfLineLocation]
+            meltLine[startOfLineLocation] = 0
+
+            #Everything up to the gap was filled, so the next module is the new start.
+            startOfLineLocation += 1
+
+        else:
+            #Visa Versa - see above comments.
+            shuffles.append((int(meltLine[endOfLineLocation]), endOfLineLocation, counter))
+            meltLine[counter] = meltLine[endOfLineLocation]
+            meltLine[endOfLineLocation] = 0
+
+            #Step back over any gaps to find the new end, the gap just filled stops this.
+            while meltLine[endOfLineLocation] == 0:
+                endOfLineLocation -= 1
+
+        counter += 1
+
+    return meltLine, shuffles
+
+#Find which module to melt next and where to, comparing every module at once.
+#Coordinates is an array with the location of each module on a row, the row of the chosen module is returned.
+def findModuleToMelt(structure, meltCoordinates, coordinates):
+
+    meltLine = getMeltLine(structure, meltCoordinates)
+    startOfMeltLine, endOfMeltLine = getStartEndOfMeltLine(meltLine)
+    axis = getMeltAxis(meltCoordinates)
+
+    #The spaces at either end of the line, which can only be moved into if they are inside the lattice.
+    startOfLine = getPointOnMeltLine(startOfMeltLine-1, meltCoordinates)
+    endOfLine = getPointOnMeltLine(endOfMeltLine+1, meltCoordinates)
+    startInLattice = isInLattice(startOfLine, structure.shape)
+    endInLattice = isInLattice(endOfLine, structure.shape)
+
+    #The gaps between the first and last module of the line.
+    gapPositions = startOfMeltLine + np.flatnonzero(meltLine[startOfMeltLine:endOfMeltLine+1] == 0)
+    gaps = np.repeat(startOfLine.getArray().reshape(1, 3).astype(np.int64), len(gapPositions), axis=0)
+    gaps[:, axis] = gapPositions
+
+    #Only modules which are not already in line can be moved.
+    fixedAxes = [i for i in range(3) if i != axis]
+    lineArray = startOfLine.getArray().astype(np.int64)
+    notInLine = (coordinates[:, fixedAxes[0]] != lineArray[fixedAxes[0]]) | (coordinates[:, fixedAxes[1]] != lineArray[fixedAxes[1]])
+    rows = np.flatnonzero(notInLine)
+    moduleCoordinates = coordinates[rows]
+
+    #A line with both ends outside the lattice can only take as many more modules as it has gaps.
+    if startInLattice == False and endInLattice == False and len(rows) > len(gapPositions):
+        raise ValueError('There are more modules than spaces on the melt line')
+
+    #Squared distances are compared, they sort the same way as the distances and are exact in a float64 for any lattice.
+    #An end of the line outside the lattice is infinitely far away, so it is never taken over a gap.
+    distFromStart = np.sum((moduleCoordinates - startOfLine.getArray().astype(np.int64))**2, axis=1).astype(np.float64)
+    distFromEnd = np.sum((moduleCoordinates - endOfLine.getArray().astype(np.int64))**2, axis=1).astype(np.float64)
+    if startInLattice == False:
+        distFromStart[:] = np.inf
+    if endInLattice == False:
+        distFromEnd[:] = np.inf
+
+    #Find out which end of the line is closest, ties go to the end.
+    useStart = distFromEnd > distFromStart
+    dist = np.where(useStart, distFromStart, distFromEnd)
+    targetGap = np.full(len(rows), -1)
+
+    #A gap is only used if it is strictly closer than the end of the line, the first of the closest gaps is taken.
+    if len(gaps) > 0:
+        distFromGaps = np.sum((moduleCoordinates[:, np.newaxis, :] - gaps[np.newaxis, :, :])**2, axis=2)
+        closestGap = np.argmin(distFromGaps, axis=1)
+        distFromClosestGap = distFromGaps[np.arange(len(rows)), closestGap]
+        gapIsCloser = distFromClosestGap < dist
+        dist = np.where(gapIsCloser, distFromClosestGap, dist)
+        targetGap = np.where(gapIsCloser, closestGap, -1)
+
+    #Take the module furthest from its closest space, ties go to the first module in the lattice.
+    furthest = np.flatnonzero(dist == np.max(dist))
+    flatLocations = np.ravel_multi_index(moduleCoordinates[furthest].T, structure.shape)
+    chosen = furthest[np.argmin(flatLocations)]
+
+    if targetGap[chosen] >= 0:
+        space = getPointOnMeltLine(gapPositions[targetGap[chosen]], meltCoordinates)
+    elif useStart[chosen] == True:
+        space = startOfLine
+    else:
+        space = endOfLine
+
+    return rows[chosen], space
+
+#Get the axis the melt line runs along.
+def getMeltAxis(meltCoordinates):
+
+    if meltCoordinates.z == 'm':
+        return 0
+    elif meltCoordinates.x == 'm':
+        return 1
+    elif meltCoordinates.y == 'm':
+        return 2
+
+#Move a module in both a structure and its index and store the movement, None as the new location puts it in the hold.
+def moveModule(structure, index, moduleID, newLocation, movements):
+
+    oldLocation = index.getTuple(moduleID)
+    if oldLocation != None:
+        structure[oldLocation] = 0
+    if newLocation != None:
+        structure[newLocation] = moduleID
+
+    index.moveModule(moduleID, newLocation)
+    movements.storeMovement(moduleID, oldLocation, newLocation)
+
+#See if a location, given as a tuple, lies on the melt line.
+def isOnMeltLine(location, meltCoordinates):
+
+    if meltCoordinates.z == 'm':
+        return location[1] == int(meltCoordinates.x) and location[2] == int(meltCoordinates.y)
+    elif meltCoordinates.x == 'm':
+        return location[0] == int(meltCoordinates.z) and location[2] == int(meltCoordinates.y)
+    elif meltCoordinates.y == 'm':
+        return location[0] == int(meltCoordinates.z) and location[1] == int(meltCoordinates.x)
+
+#See if a location is inside a lattice of a given shape, the spaces at either end of the melt line may not be.
+def isInLattice(location, shape):
+
+    for coordinate, width in zip(location.getTuple(), shape):
+        if coordinate < 0 or coordinate >= width:
+            return False
+    return True
+
 #Use the 'm' in the melt coordinates to get the melt line.
 def getPointOnMeltLine(point, meltCoordinates):
 
@@ -176,54 +327,21 @@ def getStartEndOfMeltLine(meltLine):
 
     #This function differs from the individual getters of the same name.
     #Because it uses the actual location of the first and last module, not the spaces before and after them.
+    modulesInLine = np.flatnonzero(meltLine)
 
-    #Ensure the data type is "int" to prevent issues when making comparasons. 
-    meltLine = [int(i) for i in meltLine]
-
-    #Append a zero to the end of the line, so that if there is a module at the end of the line, this method of detection will still work.
-    meltLine.append(int(0))
-
-    startOfLineFound = False 
-    counter = 0
-
-    #For every voxel in the line.
-    for voxel in meltLine:
-
-        #Start of line detector.
-        if startOfLineFound == False:
-            if voxel != 0:
-                startOfLineLocation = counter
-                startOfLineFound = True
+    startOfLineLocation = int(modulesInLine[0])
+    endOfLineLocation = int(modulesInLine[-1])
 
-        #End of line detector.
-        if startOfLineFound == True:
-            if voxel == 0 and prevVoxel != 0:
-                #As the space has been detected, not the last module an adjustment must be made.
-                endOfLineLocation = counter-1
-
-        #Check the next voxel.
-        prevVoxel = voxel
-        counter += 1
-    
-    #Once the for loop is complete, return the results.
     return startOfLineLocation, endOfLineLocation
 
-#Use a for loop to see if there are any gaps in the melt line.
+#See if there are any gaps in the melt line.
 def gapsExist(structure, meltCoordinates):
 
     meltLine = getMeltLine(structure, meltCoordinates)
     startOfLine, endOfLine = getStartEndOfMeltLine(meltLine)
 
-    #Set the counter at the start of the line, so any spaces before the first module are not counted.
-    counter = startOfLine
-    
-    #End the for loop at the end of the line for the same reason explained above.
-    while counter <= endOfLine:
-        if meltLine[int(counter)] == 0:
-            return True 
-        counter += 1
-
-    return False  
+    #Only count spaces between the first and last module, there is a gap if any of them are empty.
+    return np.count_nonzero(meltLine[startOfLine:endOfLine+1]) < endOfLine-startOfLine+1
 
 #Use the 'm' location to write a melt line (type:list) to a structure (type:3D array).
 def writeMeltLine(structure, meltCoordinates, meltLine):
@@ -240,32 +358,8 @@ def writeMeltLine(structure, meltCoordinates, meltLine):
 #Are all modules lined melted.
 def isMeltComplete(structure):
 
-    #Count lines of modules as if facing from x, y and z axes. 
-    zArray = np.count_nonzero(structure, axis=0)
-    xArray = np.count_nonzero(structure, axis=1)
-    yArray = np.count_nonzero(structure, axis=2)
-
-    #Get the largest row of modules from each axis.
-    zArrayMax = np.amax(zArray)
-    xArrayMax = np.amax(xArray)
-    yArrayMax = np.amax(yArray)
-
-    #Find the no of modules in the longest line.
-    if zArrayMax > xArrayMax and zArrayMax > yArrayMax:
-        longestLine = np.amax(zArray)
-    elif xArrayMax > zArrayMax and xArrayMax > yArrayMax:
-       longestLine = np.amax(xArray)
-    else:
-        longestLine = np.amax(yArray)
-
-    #Find the number of modules in the structure.
-    totalModules = np.count_nonzero(structure)
-
-    #See if the line is complete by comparason. 
-    if longestLine == totalModules:
-        return True 
-    else:
-        return False
+    #Count lines of modules as if facing from x, y and z axes, see if one holds every module.
+    return LineCounter(structure).isMeltComplete()
 
 #Look for a module in a list.
 def isModuleIn(array, module):
@@ -277,55 +371,23 @@ def isModuleIn(array, module):
 #Get the location of the space before the start of the melt line.
 def getStartOfLine(structure, meltCoordinates):
 
-    startOfLineID = 0
-
-    #Get the start of the line.
-    for voxel in getMeltLine(structure, meltCoordinates):
-        if voxel > 0:
-            #Get the location of the module in the actual structure.
-            startOfLineID = np.argwhere(structure==voxel)
-            break
-
     ###This try/catch tends to catch the error if the number of modules in both structures is not the same.###
     try:
-        startOfLine = mrt.Location(startOfLineID[0,0], startOfLineID[0,1], startOfLineID[0,2])
+        startOfLineLocation, endOfLineLocation = getStartEndOfMeltLine(getMeltLine(structure, meltCoordinates))
     except: 
         print('Mismatch of voxels')
         sys.exit()
 
     #Adjust so gets the first free space, not the first module.
-    if meltCoordinates.x == 0:
-        startOfLine.x -= 1
-    elif meltCoordinates.y == 0:
-        startOfLine.y -= 1
-    elif meltCoordinates.z == 0:
-        startOfLine.z -= 1
-
-    return startOfLine
+    return getPointOnMeltLine(startOfLineLocation-1, meltCoordinates)
 
 #Get the location of the space after the end of the melt line.
 def getEndOfLine(structure, meltCoordinates):
 
-    endOfLineID = 0
-
-    #Flip and search the melt line for the first module.
-    for voxel in np.flip(getMeltLine(structure, meltCoordinates)):
-        if voxel > 0:
-            #Find this modules location in the structure.
-            endOfLineID = np.argwhere(structure==voxel)
-            break
-
-    endOfLine = mrt.Location(endOfLineID[0,0], endOfLineID[0,1], endOfLineID[0,2])
+    startOfLineLocation, endOfLineLocation = getStartEndOfMeltLine(getMeltLine(structure, meltCoordinates))
 
     #Adjust so gets the next free space, not the last module.
-    if meltCoordinates.x == 0:
-        endOfLine.x += 1
-    elif meltCoordinates.y == 0:
-        endOfLine.y += 1
-    elif meltCoordinates.z == 0:
-        endOfLine.z += 1
-
-    return endOfLine
+    return getPointOnMeltLine(endOfLineLocation+1, meltCoordinates)
 
 #Use the 'm' in the melt line location to get the melt line as a list.
 def getMeltLine(structure, meltCoordinates):
@@ -337,8 +399,8 @@ def getMeltLine(structure, meltCoordinates):
     elif meltCoordinates.y == 'm':
         meltLine = structure[int(meltCoordinates.z),  int(meltCoordinates.x), :]
 
-    #Ensure the values returned are integers, so comparasons perfromed on the melt line run correctly.
-    meltLine = [int(i) for i in meltLine] 
+    #Copy the line so it can be changed without changing the structure, keeping its integer type.
+    meltLine = np.array(meltLine)
 
     return meltLine
 
@@ -349,16 +411,30 @@ def getMeltLine(structure, meltCoordinates):
 
 
 #Move the melted initial structure to the melted goal structure, do not sort yet.
-def allignMeltLines(initialStructure, goalStructure, movements, widthOfLattice, goalMeltCoordinates):
+#The 'greedy' mode moves the module furthest from a space first, one at a time.
+#The 'optimal' mode moves every module at once so that the total distance travelled is as small as possible.
+def allignMeltLines(initialStructure, goalStructure, movements, widthOfLattice, goalMeltCoordinates, mode='greedy'):
 
-    voxelsToMove = findUnmatchedModules(initialStructure, widthOfLattice, goalMeltCoordinates)
+    stats = movements.getStats()
+
+    #Index the modules once, so they can be found without searching the lattice.
+    index = mrt.ModuleIndex(initialStructure)
+    stats.count('latticeScans')
+
+    with stats.phase('findUnmatchedModules'):
+        voxelsToMove = findUnmatchedModules(index, goalMeltCoordinates)
+
+    if mode == 'optimal':
+        return allignMeltLinesOptimally(initialStructure, index, movements, voxelsToMove, goalMeltCoordinates)
+    elif mode != 'greedy':
+        raise ValueError('Unknown allign mode ' + str(mode))
     
     #While lines don't match.
     while voxelsToMove != []:
 
         spaces = []
         counter = 0
-        currentMeltLine = getMeltLine(initialStructure, goalMeltCoordinates)########################
+        currentMeltLine = getMeltLine(initialStructure, goalMeltCoordinates)
 
         #Get the locations of empty spaces we can move into on the melt line.
         for voxel in currentMeltLine:
@@ -372,10 +448,11 @@ def allignMeltLines(initialStructure, goalStructure, movements, widthOfLattice,
 
         #Find the module bet suited to be moved and store it.
         for voxelToMove in voxelsToMove:
+            voxelLocation = np.array(index.getTuple(voxelToMove))
             for space in spaces:
 
                 #Find the distance between the space and the voxel.
-                dist = abs(np.linalg.norm(np.argwhere(initialStructure==voxelToMove)-space.getArray()))
+                dist = abs(np.linalg.norm(voxelLocation-space.getArray()))
 
                 if smallestDist == None: 
                     dist = smallestDist
@@ -392,121 +469,177 @@ def allignMeltLines(initialStructure, goalStructure, movements, widthOfLattice,
                 moduleToMoveID = possibleModule
                 spaceToMoveTo = possibleSpace
 
-        #Move the voxel.
-        oldLocation = np.argwhere(initialStructure==moduleToMoveID)
-        initialStructure[oldLocation[0,0], oldLocation[0,1], oldLocation[0,2]] = 0
-        initialStructure[spaceToMoveTo.getTuple()] = moduleToMoveID
-
-        #Store the movement. 
-        movements.storeMovement(initialStructure, moduleToMoveID)
+        #Move the voxel and store the movement.
+        moveModule(initialStructure, index, moduleToMoveID, spaceToMoveTo.getTuple(), movements)
+        stats.count('allignSweeps')
 
         #Update the list of unmatched voxels. 
-        voxelsToMove = findUnmatchedModules(initialStructure, widthOfLattice, goalMeltCoordinates)
+        with stats.phase('findUnmatchedModules'):
+            voxelsToMove = findUnmatchedModules(index, goalMeltCoordinates)
 
     #When the list of unmatched voxels is empty, return the shuffled structure.
     return initialStructure
 
-#Get a list of modules which are not in the melt goal line.
-def findUnmatchedModules(initialStructure, widthOfLattice, goalMeltCoordinates):
-
-    #Backup the melt line.
-    meltLineBackup = getMeltLine(initialStructure, goalMeltCoordinates)
-
-    #Create a blank melt line.
-    meltLine = []
-    counter = widthOfLattice
-    while counter > 0:
-        meltLine.append(0)
-        counter -= 1
-
-    #Write the blank melt line to the structure. Deleting all the modules which are in the correct location.
-    structure = writeMeltLine(initialStructure, goalMeltCoordinates, meltLine)
-
-    #The left over modules need to be moved. Store and eventually return them.
-    modulesToMove = []
-    for voxel in np.nditer(structure):
-        if voxel > 0:
-            modulesToMove.append(int(voxel))
-
-    #Rewrite the melt line so the structure is not affected. 
-    initialStructure = writeMeltLine(initialStructure, goalMeltCoordinates, meltLineBackup)
-
-    #Return the list of displaced modules.
-    return modulesToMove
-
-#Sort the modules so that they match the melted goal line. 
-def sort(initialStructure, goalStructure, meltCoordinates, movements):
-
-    goalMeltLine = getMeltLine(goalStructure, meltCoordinates)
-    meltLine = getMeltLine(initialStructure, meltCoordinates)
-
-    #Check if the modules are already sorted.
-    arraysEqual = np.array_equal(goalMeltLine, meltLine)
-
-    while arraysEqual == False:
-        meltLine = getMeltLine(initialStructure, meltCoordinates)
-        arraysEqual = np.array_equal(goalMeltLine, meltLine)
+#Move every unmatched module to a space on the goal melt line, minimising the total distance travelled.
+def allignMeltLinesOptimally(initialStructure, index, movements, voxelsToMove, goalMeltCoordinates):
 
-        #Iterate the goal and current melt lines simultaneously, checking for inconsistencies. 
-        for voxel, goalVoxel in zip(meltLine, goalMeltLine):
+    if voxelsToMove == []:
+        return initialStructure
 
-            hold = False
+    #Get the locations of empty spaces we can move into on the melt line.
+    currentMeltLine = getMeltLine(initialStructure, goalMeltCoordinates)
+    spaces = [getPointOnMeltLine(counter, goalMeltCoordinates) for counter in np.flatnonzero(currentMeltLine == 0)]
 
-            #If an inconsistency is found, swap the two modules so that one is now in the correct location.
-            if int(voxel) != int(goalVoxel):
+    if len(spaces) < len(voxelsToMove):
+        raise ValueError('There are more modules than spaces on the melt line')
 
-                voxelOldLocation = mrt.Location(0,0,0)
-                voxelNewLocation = mrt.Location(0,0,0)
-                goalVoxelOldLocation = mrt.Location(0,0,0) 
-                goalVoxelNewLocation = mrt.Location(0,0,0) 
+    #Build the cost of moving every module to every space, then find the cheapest way to fill the spaces.
+    moduleLocations = np.array([index.getTuple(voxelToMove) for voxelToMove in voxelsToMove], dtype=np.int64)
+    spaceLocations = np.array([space.getTuple() for space in spaces], dtype=np.int64)
+    costs = np.linalg.norm(moduleLocations[:, np.newaxis, :] - spaceLocations[np.newaxis, :, :], axis=2)
+    assignment = solveAssignment(costs)
 
-                #First movement.
-                if voxel != 0:
+    #Every space is empty and different, so the modules can be moved in any order.
+    for voxelToMove, spaceNo in zip(voxelsToMove, assignment):
+        moveModule(initialStructure, index, voxelToMove, spaces[spaceNo].getTuple(), movements)
 
-                    voxelOldLocation.setLocationWithTuple(np.where(initialStructure==voxel))
-                    voxelNewLocation.setLocationWithTuple(np.where(goalStructure==voxel))
+    return initialStructure
 
-                    #If both spaces are occupied, activate the hold function.
-                    if initialStructure[voxelOldLocation.getTuple()] != 0 and initialStructure[voxelNewLocation.getTuple()] != 0:
-                        hold = True
+#Solve a minimum cost assignment with the Hungarian method, every row is given a different column.
+#The cost matrix must have at least as many columns as rows. Returns the column for each row.
+def solveAssignment(costs):
+
+    costs = np.asarray(costs, dtype=np.float64)
+    noOfRows, noOfColumns = costs.shape
+
+    #Potentials for rows and columns, and the row matched to each column. Index zero is a dummy column.
+    rowPotentials = np.zeros(noOfRows+1)
+    columnPotentials = np.zeros(noOfColumns+1)
+    matchedRow = np.zeros(noOfColumns+1, dtype=np.int64)
+    previousColumn = np.zeros(noOfColumns+1, dtype=np.int64)
+
+    #Add one row at a time, growing a path of tight edges until a free column is found.
+    for row in range(1, noOfRows+1):
+
+        matchedRow[0] = row
+        column = 0
+        smallestSlack = np.full(noOfColumns+1, np.inf)
+        used = np.zeros(noOfColumns+1, dtype=bool)
+
+        while True:
+            used[column] = True
+            currentRow = matchedRow[column]
+
+            #Update the slack of every unused column from the newest row on the path.
+            free = used == False
+            slack = costs[currentRow-1] - rowPotentials[currentRow] - columnPotentials[1:]
+            improved = free[1:] & (slack < smallestSlack[1:])
+            smallestSlack[1:][improved] = slack[improved]
+            previousColumn[1:][improved] = column
+
+            #Take the unused column with the least slack and shift the potentials by it.
+            candidates = np.where(free[1:], smallestSlack[1:], np.inf)
+            nextColumn = int(np.argmin(candidates)) + 1
+            delta = candidates[nextColumn-1]
+
+            rowPotentials[matchedRow[used]] += delta
+            columnPotentials[used] -= delta
+            smallestSlack[free] -= delta
+
+            column = nextColumn
+            if matchedRow[column] == 0:
+                break
 
-                    #Remove first module from current spot.
-                    initialStructure[voxelOldLocation.getTuple()] = 0
+        #Flip the matches along the path back to the new row.
+        while column != 0:
+            previous = previousColumn[column]
+            matchedRow[column] = matchedRow[previous]
+            column = previous
 
-                    #If not entering hold, redraw first module.
-                    if hold == False:
-                        initialStructure[voxelNewLocation.getTuple()] = voxel
-                        
-                    #Record the first movement.
-                    movements.storeMovement(initialStructure, voxel)
+    assignment = np.zeros(noOfRows, dtype=np.int64)
+    for column in range(1, noOfColumns+1):
+        if matchedRow[column] != 0:
+            assignment[matchedRow[column]-1] = column-1
 
-                #Second movement.
-                if goalVoxel != 0:
+    return assignment
 
-                    goalVoxelOldLocation.setLocationWithTuple(np.where(initialStructure==goalVoxel))
-                    goalVoxelNewLocation.setLocationWithTuple(np.where(goalStructure==goalVoxel))
+#Get a list of modules which are not in the melt goal line.
+def findUnmatchedModules(index, goalMeltCoordinates):
 
-                    #Remove second module from original spot.
-                    initialStructure[goalVoxelOldLocation.getTuple()] = 0
+    #The modules which are not on the goal melt line need to be moved. Store and eventually return them.
+    modulesToMove = []
+    for moduleID in index.getModules():
+        if isOnMeltLine(index.getTuple(moduleID), goalMeltCoordinates) == False:
+            modulesToMove.append(moduleID)
 
-                    #Draw second module in new spot.
-                    initialStructure[goalVoxelNewLocation.getTuple()] = goalVoxel 
+    #Return the list of displaced modules.
+    return modulesToMove
 
-                    #Record the second movement.
-                    movements.storeMovement(initialStructure, goalVoxel)
+#Sort the modules so that they match the melted goal line. 
+#The order of the line is treated as a permutation of the goal line and split into chains and cycles.
+#A chain ends in an empty space, so it can be sorted by moving each module once, starting from that end.
+#A cycle has no empty space, so one module goes into the hold while the rest move round, then comes out.
+def sort(initialStructure, goalStructure, meltCoordinates, movements):
 
-                #Third Movement. If the first module to be moved was put in the hold, bring it back out.
-                if hold == True:
+    stats = movements.getStats()
 
-                    initialStructure[goalVoxelOldLocation.getTuple()] = voxel
+    #Index the modules once, so they can be found without searching the lattice.
+    index = mrt.ModuleIndex(initialStructure)
+    stats.count('latticeScans')
 
-                    #Record the third movement, if there was one.
-                    movements.storeMovement(initialStructure, voxel)
+    goalMeltLine = getMeltLine(goalStructure, meltCoordinates)
+    meltLine = getMeltLine(initialStructure, meltCoordinates)
 
-                #Recheck if the modules are sorted.
-                arraysEqual = np.array_equal(goalMeltLine, meltLine)
-                meltLine = getMeltLine(initialStructure, meltCoordinates)
-                break
+    #Where each module is in the line now and where it belongs.
+    positions = {int(moduleID): position for position, moduleID in enumerate(meltLine) if moduleID != 0}
+    goalPositions = {int(moduleID): position for position, moduleID in enumerate(goalMeltLine) if moduleID != 0}
+
+    if sorted(positions) != sorted(goalPositions):
+        raise ValueError('Mismatch of voxels, the melted lines do not hold the same modules')
+
+    #Move a module along the line, None as the position puts it in the hold.
+    def moveAlongLine(moduleID, position):
+
+        if positions[moduleID] != None:
+            meltLine[positions[moduleID]] = 0
+        if position == None:
+            moveModule(initialStructure, index, moduleID, None, movements)
+        else:
+            meltLine[position] = moduleID
+            moveModule(initialStructure, index, moduleID, getPointOnMeltLine(position, meltCoordinates).getTuple(), movements)
+        positions[moduleID] = position
+
+    #Chains. Start with every module whose goal space is already empty.
+    chainStarts = [moduleID for moduleID in goalPositions
+        if positions[moduleID] != goalPositions[moduleID] and meltLine[goalPositions[moduleID]] == 0]
+    chainStarts.sort(key=lambda moduleID: positions[moduleID])
+
+    stats.count('chains', len(chainStarts))
+    for moduleID in chainStarts:
+        while moduleID != 0:
+            emptiedPosition = positions[moduleID]
+            moveAlongLine(moduleID, goalPositions[moduleID])
+
+            #The module which belongs in the space just emptied is next in the chain.
+            moduleID = int(goalMeltLine[emptiedPosition])
+
+    #Cycles. Whatever is still out of place is in a cycle, each is sorted with one trip to the hold.
+    for position in range(len(meltLine)):
+        if meltLine[position] != 0 and meltLine[position] != goalMeltLine[position]:
+
+            heldModule = int(meltLine[position])
+            moveAlongLine(heldModule, None)
+            stats.count('cycles')
+
+            #Move the rest of the cycle round, one space at a time, until the held module's space is empty.
+            emptyPosition = position
+            while emptyPosition != goalPositions[heldModule]:
+                moduleID = int(goalMeltLine[emptyPosition])
+                nextEmptyPosition = positions[moduleID]
+                moveAlongLine(moduleID, emptyPosition)
+                emptyPosition = nextEmptyPosition
+
+            moveAlongLine(heldModule, emptyPosition)
 
     #Return the sorted initial structure, ready to grow.
     return initialStructure
@@ -517,34 +650,204 @@ def sort(initialStructure, goalStructure, meltCoordinates, movements):
 ################
 
 
-#Entry point to the program.
-def main(initialStructure, goalStructure, widthOfLattice=10):
+#Melt a single structure along its best line, with its own movements object.
+#Used for both halves of the plan, so either can be melted in another process.
+#listener is called with each movement as it is made, see mrt.Movements.addListener.
+#The melt is measured as a phase named phaseName in stats, or in new stats kept with the movements if not given.
+def meltStructure(structure, timeLimit=None, listener=None, stats=None, phaseName='melt'):
 
-    ###SETUP###
-    #Create movements object to track movements.
-    #Melt goal is separate so it can be flipped and combined with overall movements.
-    movements = mrt.Movements(initialStructure)
-    meltGoalMovements = mrt.Movements(goalStructure)
+    movements = mrt.Movements(structure)
+    movements.setTimeLimit(timeLimit)
+    if listener != None:
+        movements.addListener(listener)
+    if stats != None:
+        movements.setStats(stats)
+    stats = movements.getStats()
+
+    with stats.phase(phaseName, movements):
+        with stats.phase('findMeltCoordinates'):
+            meltCoordinates = findMeltCoordinates(structure)
+            stats.count('latticeScans')
+        structure = melt(structure, meltCoordinates, movements)
+
+    return meltCoordinates, structure, movements
+
+#Entry point to the program.
+#Structures can be dense arrays or sparse structures of any size, the lattice width is taken from them if not given.
+#allignMode chooses how the melt lines are alligned, 'greedy' or 'optimal', see allignMeltLines.
+#timeLimit is the number of seconds planning can take before mrt.PlanningTimeout is raised, None for no limit.
+#parallelMelt melts the goal structure in another process while the initial structure is melted here.
+#It can be True, to start a process just for this plan, or an executor (such as a ProcessPoolExecutor) to reuse.
+#planCache is a PlanCache.PlanCache to reuse plans and melts from, and store new ones in, None to plan from scratch.
+#symmetry keeps the cached plans and melts in canonical space, so they are shared by rotated, reflected and moved structures.
+#listener is called with the module ID, old location and new location of each movement of the plan, in order, as soon as
+#it is decided, so the plan can be used before it is finished. Locations are (z,x,y) tuples or None for the hold.
+#The time and work of each phase is measured in the mrt.PlanningStats returned by the movements' getStats.
+#phaseHook is called as each phase starts and ends, see mrt.PlanningStats.addHook, except for a melt in another process.
+def main(initialStructure, goalStructure, widthOfLattice=None, allignMode='greedy', timeLimit=None, parallelMelt=False, planCache=None, symmetry=False, listener=None, phaseHook=None):
+
+    if widthOfLattice == None:
+        widthOfLattice = initialStructure.shape[0]
+
+    startTime = time.perf_counter()
+
+    stats = mrt.PlanningStats()
+    if phaseHook != None:
+        stats.addHook(phaseHook)
+
+    #Store the structures as compact integer copies, so the ones passed in are not changed.
+    initialStructure = mrt.getCompactStructure(initialStructure)
+    goalStructure = mrt.getCompactStructure(goalStructure)
+
+    #Return a plan that has already been made between these structures, or reuse the melts of either of them.
+    initialMelt = None
+    goalMelt = None
+    if planCache != None:
+        with stats.phase('cache'):
+            if symmetry == True:
+                #The plan uses one transform for both structures, so they stay in the same place relative to each other.
+                planTransform, (initialPlanKey, goalPlanKey) = sym.getCanonicalForm([initialStructure, goalStructure])
+                initialTransform, (initialKey,) = sym.getCanonicalForm([initialStructure])
+                goalTransform, (goalKey,) = sym.getCanonicalForm([goalStructure])
+            else:
+                planTransform = initialTransform = goalTransform = None
+                initialKey = initialPlanKey = pc.getStructureKey(initialStructure)
+                goalKey = goalPlanKey = pc.getStructureKey(goalStructure)
+            planKey = pc.getPlanKey(initialPlanKey, goalPlanKey, widthOfLattice, {'allignMode': allignMode})
+
+            movements = planCache.getPlan(planKey, planTransform)
+            if movements == None:
+                initialMelt = planCache.getMelt(pc.getMeltKey(initialKey), initialStructure, initialTransform)
+                goalMelt = planCache.getMelt(pc.getMeltKey(goalKey), goalStructure, goalTransform)
+                initialMelted = initialMelt == None
+                goalMelted = goalMelt == None
+
+        if movements != None:
+            stats.count('cachedPlans')
+            movements.setStats(stats)
+            sendMovements(movements.getMovements(), listener)
+            return True, movements
 
     ###MELT###
-    #Melt initial structure.
-    meltCoordinates = findMeltCoordinates(initialStructure)
-    initialStructure = melt(initialStructure, meltCoordinates, movements)
-    #Melt goal structure.
-    goalMeltCoordinates = findMeltCoordinates(goalStructure)
-    goalStructure = melt(goalStructure, goalMeltCoordinates, meltGoalMovements)
+    #Each structure is melted with its own movements object.
+    #Melt goal is separate so it can be flipped and combined with overall movements.
+    if parallelMelt == False or initialMelt != None or goalMelt != None:
+        if initialMelt == None:
+            initialMelt = meltStructure(initialStructure, timeLimit, listener, stats, 'meltInitial')
+        else:
+            #Cached melts were not made here, so their movements are sent on all at once.
+            stats.count('cachedMelts')
+            initialMelt[2].setStats(stats)
+            sendMovements(initialMelt[2].getMovements(), listener)
+            if listener != None:
+                initialMelt[2].addListener(listener)
+        if goalMelt == None:
+            goalMelt = meltStructure(goalStructure, getTimeLeft(startTime, timeLimit), None, stats, 'meltGoal')
+        else:
+            stats.count('cachedMelts')
+    else:
+        #Melt the goal structure in the background while the initial structure is melted, then join them.
+        executor = parallelMelt
+        if parallelMelt == True:
+            executor = ProcessPoolExecutor(max_workers=1)
+        try:
+            goalMeltFuture = executor.submit(meltStructure, goalStructure, timeLimit, None, None, 'meltGoal')
+            initialMelt = meltStructure(initialStructure, timeLimit, listener, stats, 'meltInitial')
+            goalMelt = goalMeltFuture.result()
+        finally:
+            if parallelMelt == True:
+                executor.shutdown()
+
+        #The goal was measured in the other process, while the initial structure was melted here.
+        stats.merge(goalMelt[2].getStats())
+
+    meltCoordinates, initialStructure, movements = initialMelt
+    goalMeltCoordinates, goalStructure, meltGoalMovements = goalMelt
+
+    #Cache new melts before the sort phase changes them.
+    if planCache != None:
+        with stats.phase('cache'):
+            if initialMelted == True:
+                planCache.storeMelt(pc.getMeltKey(initialKey), meltCoordinates, initialStructure, movements, initialTransform)
+            if goalMelted == True:
+                planCache.storeMelt(pc.getMeltKey(goalKey), goalMeltCoordinates, goalStructure, meltGoalMovements, goalTransform)
+
+    #The rest of the plan is stored in the initial movements, which must finish within what is left of the time limit.
+    movements.setTimeLimit(getTimeLeft(startTime, timeLimit))
 
     ###SORT###
     #Allign melt lines #move the decomposed initial structure to the location of the goal melt structure
-    initialStructure = allignMeltLines(initialStructure, goalStructure, movements, widthOfLattice, goalMeltCoordinates)
+    with stats.phase('allign', movements):
+        initialStructure = allignMeltLines(initialStructure, goalStructure, movements, widthOfLattice, goalMeltCoordinates, allignMode)
     #Sort so current line matches goal melt line.
-    initialStructure = sort(initialStructure, goalStructure, goalMeltCoordinates, movements)
+    with stats.phase('sort', movements):
+        initialStructure = sort(initialStructure, goalStructure, goalMeltCoordinates, movements)
 
     ###GROW###
     #Reverse the order in which movements are performed and swap every old and new location.
-    meltGoalMovements.flip()
+    #The grow phase reuses the movements of the goal melt, so its phases are not counted as storing any.
+    with stats.phase('flip'):
+        meltGoalMovements.flip()
+    sendMovements(meltGoalMovements.getMovements(), listener)
     #Add the new movements to the main list of movements.
-    movements.combine(meltGoalMovements)
+    with stats.phase('combine'):
+        movements.combine(meltGoalMovements)
+
+    if planCache != None:
+        with stats.phase('cache'):
+            planCache.storePlan(planKey, movements, planTransform)
 
     #Return to the GUI, letting it know the MSG was a success and return the completed movements.
     return True, movements
+
+#Send every movement in a log to a listener, for movements that were not made one at a time while planning.
+def sendMovements(movementLog, listener):
+
+    if listener == None:
+        return
+
+    for moduleID, oldLocation, newLocation in movementLog.getTuples():
+        listener(moduleID, oldLocation, newLocation)
+
+#Plan a reconfiguration as a stream of movements, yielding each one as soon as it is decided.
+#A robot can start on the first movements while the rest are still being planned. Takes the same options as main.
+#Planning runs in a thread, any error it raises is raised here. Closing the stream early stops the planning.
+#Each movement is a module ID and two (z,x,y) tuples, or None for the hold, and the completed movements are returned.
+def streamPlan(initialStructure, goalStructure, **options):
+
+    movementQueue = queue.Queue()
+    cancelled = threading.Event()
+    planEnd = object()
+
+    def queueMovement(moduleID, oldLocation, newLocation):
+        if cancelled.is_set():
+            raise mrt.PlanningCancelled('The stream of movements was closed')
+        movementQueue.put((moduleID, oldLocation, newLocation))
+
+    def planInBackground():
+        try:
+            meltSuccsessful, movements = main(initialStructure, goalStructure, listener=queueMovement, **options)
+            movementQueue.put((planEnd, movements))
+        except BaseException as e:
+            movementQueue.put((planEnd, e))
+
+    planner = threading.Thread(target=planInBackground, daemon=True)
+    planner.start()
+
+    try:
+        while True:
+            movement = movementQueue.get()
+            if movement[0] is planEnd:
+                if isinstance(movement[1], BaseException):
+                    raise movement[1]
+                return movement[1]
+            yield movement
+    finally:
+        cancelled.set()
+
+#Get how many seconds of a time limit are left, None if there is no limit.
+def getTimeLeft(startTime, timeLimit):
+
+    if timeLimit == None:
+        return None
+    return timeLimit - (time.perf_counter() - startTime)
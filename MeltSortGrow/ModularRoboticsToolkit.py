@@ -1,7 +1,7 @@
 #Import dependencies.
 import numpy as np
-import matplotlib.pyplot as plt
-import sys, os, inspect
+import sys, os, inspect, time, zlib
+from contextlib import contextmanager
 
 #Object for storing a 3D cartesian coodinate.
 class Location():
@@ -53,108 +53,569 @@ class Location():
     def getTuple(self):
         return (self.z, self.x, self.y)
 
+#Keeps track of where every module is, so a module can be found without searching the whole lattice.
+#Must be kept in sync with the structure it was built from by calling moveModule for every move.
+class ModuleIndex():
+
+    #Initialise with a structure, indexing every module in a single pass.
+    def __init__(self, structure):
+
+        #Module ID -> (z,x,y) and (z,x,y) -> module ID.
+        self.locations = {}
+        self.occupancy = {}
+
+        #An empty index can be made with no structure.
+        if structure is None:
+            return
+
+        #Sparse structures are already indexed, so their maps can be copied.
+        if isinstance(structure, ModuleIndex):
+            for coordinates, moduleID in structure.occupancy.items():
+                self.locations[moduleID] = coordinates
+                self.occupancy[coordinates] = moduleID
+            return
+
+        #Every module must have its own ID, or movements of one could not be told apart from another.
+        for coordinates in np.argwhere(structure != 0):
+            coordinates = tuple(int(i) for i in coordinates)
+            moduleID = int(structure[coordinates])
+            if moduleID in self.locations:
+                raise ValueError('Module ' + str(moduleID) + ' is at both ' + str(self.locations[moduleID]) + ' and ' + str(coordinates))
+            self.locations[moduleID] = coordinates
+            self.occupancy[coordinates] = moduleID
+
+    #See if a module is in the structure, modules in the hold are not.
+    def isModuleIn(self, moduleID):
+        return int(moduleID) in self.locations
+
+    #Get the location of a module as a tuple, None if it is not in the structure.
+    def getTuple(self, moduleID):
+        return self.locations.get(int(moduleID))
+
+    #Get the location of a module as a location object.
+    def getLocation(self, moduleID):
+        return Location(*self.locations[int(moduleID)])
+
+    #Get the ID of the module at a location, zero if the voxel is empty.
+    def getID(self, coordinates):
+        return self.occupancy.get(tuple(int(i) for i in coordinates), 0)
+
+    #Get every module ID, in the same order np.nditer would find them in the structure.
+    def getModules(self):
+        return [self.occupancy[coordinates] for coordinates in sorted(self.occupancy)]
+
+    #Move a module, None as the new location puts it in the hold.
+    def moveModule(self, moduleID, newLocation):
+
+        moduleID = int(moduleID)
+
+        #Remove the module from its old location, if it has one.
+        oldLocation = self.locations.pop(moduleID, None)
+        if oldLocation != None and self.occupancy.get(oldLocation) == moduleID:
+            del self.occupancy[oldLocation]
+
+        if newLocation != None:
+            newLocation = tuple(int(i) for i in newLocation)
+
+            #Any module already in the new location is overwritten, as it would be in the structure array.
+            overwrittenID = self.occupancy.get(newLocation)
+            if overwrittenID != None:
+                del self.locations[overwrittenID]
+
+            self.locations[moduleID] = newLocation
+            self.occupancy[newLocation] = moduleID
+
+    #Find the amount of modules in the structure.
+    def legnth(self):
+        return len(self.locations)
+
+#A structure stored as the set of occupied coordinates and a map of module IDs, rather than a dense array.
+#Memory scales with the number of modules instead of the volume of the lattice, so any lattice size can be used.
+#Supports the same indexing as a structure array for single voxels and whole lines, so can be used in place of one.
+class SparseStructure(ModuleIndex):
+
+    #Initialise with the shape of the lattice and, optionally, the coordinates and IDs of the modules in it.
+    #Raises ValueError if two modules have the same ID, as ModuleIndex does.
+    def __init__(self, shape, coordinates=[], moduleIDs=[]):
+
+        self.shape = tuple(int(i) for i in shape)
+        self.ndim = 3
+        self.locations = {}
+        self.occupancy = {}
+
+        for location, moduleID in zip(coordinates, moduleIDs):
+            location = tuple(int(i) for i in location)
+            if int(moduleID) in self.locations:
+                raise ValueError('Module ' + str(int(moduleID)) + ' is at both ' + str(self.locations[int(moduleID)]) + ' and ' + str(location))
+            self[location] = moduleID
+
+    #Get the coordinates a key refers to, a key is either a single voxel or a line with one slice in it.
+    def getKeyCoordinates(self, key):
+
+        if len(key) != 3:
+            raise IndexError('Sparse structures must be indexed with three coordinates')
+
+        ranges = []
+        for axis in range(3):
+            if isinstance(key[axis], slice):
+                ranges.append(range(*key[axis].indices(self.shape[axis])))
+            else:
+                coordinate = int(key[axis])
+                if coordinate < 0 or coordinate >= self.shape[axis]:
+                    raise IndexError('index ' + str(coordinate) + ' is out of bounds for axis ' + str(axis) + ' with size ' + str(self.shape[axis]))
+                ranges.append([coordinate])
+
+        return [(z, x, y) for z in ranges[0] for x in ranges[1] for y in ranges[2]]
+
+    #Get a voxel, or a line of voxels as an array.
+    def __getitem__(self, key):
+
+        if all(isinstance(i, slice) == False for i in key):
+            return self.getID(key)
+
+        return np.array([self.occupancy.get(coordinates, 0) for coordinates in self.getKeyCoordinates(key)])
+
+    #Set a voxel, or a line of voxels from a list. Zero empties a voxel.
+    def __setitem__(self, key, value):
+
+        keyCoordinates = self.getKeyCoordinates(key)
+        if len(keyCoordinates) == 1:
+            values = [value]
+        else:
+            values = list(value)
+
+        for coordinates, moduleID in zip(keyCoordinates, values):
+            moduleID = int(moduleID)
+
+            #Remove whatever is in the voxel, a module written elsewhere since keeps its newer location.
+            oldID = self.occupancy.pop(coordinates, 0)
+            if oldID != 0 and self.locations.get(oldID) == coordinates:
+                del self.locations[oldID]
+
+            if moduleID != 0:
+                self.occupancy[coordinates] = moduleID
+                self.locations[moduleID] = coordinates
+
+    #Get a copy which can be changed without affecting this structure.
+    def copy(self):
+
+        structure = SparseStructure(self.shape)
+        structure.locations = dict(self.locations)
+        structure.occupancy = dict(self.occupancy)
+        return structure
+
+    #Get the coordinates and IDs of every module as arrays, in the same order np.nditer would find them.
+    def getCoordinates(self):
+
+        coordinates = sorted(self.occupancy)
+        moduleIDs = np.array([self.occupancy[i] for i in coordinates], dtype=np.int64)
+        coordinates = np.array(coordinates, dtype=np.int64).reshape(-1, 3)
+        return coordinates, moduleIDs
+
+    #Get the structure as a dense array, using the smallest integer type that holds its IDs.
+    def getDense(self):
+
+        structure = np.zeros(self.shape, dtype=getIDType(max(self.locations, default=0)))
+        coordinates, moduleIDs = self.getCoordinates()
+        structure[coordinates[:,0], coordinates[:,1], coordinates[:,2]] = moduleIDs
+        return structure
+
+#Get a sparse copy of a structure, which can be either a dense array or sparse already.
+def getSparseStructure(structure):
+
+    if isinstance(structure, SparseStructure):
+        return structure.copy()
+
+    coordinates = np.argwhere(structure != 0)
+    return SparseStructure(np.shape(structure), coordinates, structure[tuple(coordinates.T)])
+
+#Get a structure as a dense array, which is the structure itself if it is already dense.
+def getDenseStructure(structure):
+
+    if isinstance(structure, SparseStructure):
+        return structure.getDense()
+    return structure
+
+#Get the smallest integer type which can hold every module ID, IDs count up from one.
+#IDs must also fit in the movement log, so raises ValueError for more modules than a logType can count.
+def getIDType(noOfModules):
+
+    if noOfModules <= np.iinfo(np.uint16).max:
+        return np.uint16
+    if noOfModules <= np.iinfo(logType).max:
+        return np.uint32
+    raise ValueError(str(noOfModules) + ' modules is more than the movement log can hold')
+
+#Get a copy of a structure which uses the smallest integer type that holds its IDs.
+#Sparse structures are copied as they are, they do not store an array.
+def getCompactStructure(structure):
+
+    if isinstance(structure, SparseStructure):
+        return structure.copy()
+
+    structure = np.asarray(structure)
+    largestID = int(np.max(structure)) if np.size(structure) > 0 else 0
+    return structure.astype(getIDType(largestID))
+
+#Count the modules along every line parallel to an axis, as np.count_nonzero would for a dense array.
+def countLines(structure, axis):
+
+    if isinstance(structure, SparseStructure):
+        shape = [length for i, length in enumerate(structure.shape) if i != axis]
+        counts = np.zeros(shape, dtype=np.int64)
+        if len(structure.occupancy) > 0:
+            coordinates = np.delete(np.array(list(structure.occupancy)), axis, axis=1)
+            np.add.at(counts, (coordinates[:,0], coordinates[:,1]), 1)
+        return counts
+
+    return np.count_nonzero(structure, axis=axis)
+
+#Count the modules in a structure.
+def countModules(structure):
+
+    if isinstance(structure, SparseStructure):
+        return len(structure.occupancy)
+    return np.count_nonzero(structure)
+
+#Rows of the movement log, one per column of integers.
+#Hold locations are stored as zeros with the hold flag set.
+#32 bit integers hold any module ID or coordinate while using half the memory of NumPy's default.
+logType = np.int32
+ID, OLD_Z, OLD_X, OLD_Y, NEW_Z, NEW_X, NEW_Y, OLD_HOLD, NEW_HOLD = range(9)
+noOfLogRows = 9
+
+#A growable, append only log of movements stored as integer columns.
+#Space is doubled when it runs out, so each append is O(1) amortised and the history is never copied per movement.
+class MovementLog():
+
+    #Initialise with some preallocated space.
+    def __init__(self, capacity=64):
+
+        self.data = np.zeros((noOfLogRows, max(int(capacity), 1)), dtype=logType)
+        self.size = 0
+
+    #Find the amount of movements in the log.
+    def __len__(self):
+        return self.size
+
+    #Make sure there is room for a number of extra movements.
+    def reserve(self, extraMovements):
+
+        if self.size + extraMovements > self.data.shape[1]:
+            capacity = max(self.data.shape[1]*2, self.size + extraMovements)
+            data = np.zeros((noOfLogRows, capacity), dtype=self.data.dtype)
+            data[:, :self.size] = self.data[:, :self.size]
+            self.data = data
+
+    #Add a movement to the end of the log, locations are (z,x,y) tuples or None for the hold.
+    def append(self, moduleID, oldLocation, newLocation):
+
+        self.reserve(1)
+        column = self.data[:, self.size]
+
+        column[ID] = moduleID
+        if oldLocation == None:
+            column[OLD_HOLD] = 1
+            column[OLD_Z:OLD_Y+1] = 0
+        else:
+            column[OLD_HOLD] = 0
+            column[OLD_Z:OLD_Y+1] = oldLocation
+        if newLocation == None:
+            column[NEW_HOLD] = 1
+            column[NEW_Z:NEW_Y+1] = 0
+        else:
+            column[NEW_HOLD] = 0
+            column[NEW_Z:NEW_Y+1] = newLocation
+
+        self.size += 1
+
+    #Add every movement from another log to the end of this one, as a single block copy.
+    def extend(self, otherLog):
+
+        self.reserve(otherLog.size)
+        self.data[:, self.size:self.size+otherLog.size] = otherLog.getArray()
+        self.size += otherLog.size
+
+    #Reverse the order of the movements and swap every old and new location, in place.
+    def flip(self):
+
+        self.data[:, :self.size] = self.data[:, :self.size][:, ::-1]
+        self.data[[OLD_Z, OLD_X, OLD_Y, OLD_HOLD, NEW_Z, NEW_X, NEW_Y, NEW_HOLD], :self.size] = \
+            self.data[[NEW_Z, NEW_X, NEW_Y, NEW_HOLD, OLD_Z, OLD_X, OLD_Y, OLD_HOLD], :self.size]
+
+    #Get the used part of the log, one row per column of integers.
+    def getArray(self):
+        return self.data[:, :self.size]
+
+    #Get every movement from a step up to, but not including, an end step, as a module ID and (z,x,y) tuples or None for the hold.
+    def getTuples(self, startStep=0, endStep=None):
+
+        if endStep == None or endStep > self.size:
+            endStep = self.size
+
+        #Convert a block of movements at a time, so large logs are never all held as Python objects.
+        for blockStart in range(startStep, endStep, 4096):
+            for column in self.data[:, blockStart:min(blockStart+4096, endStep)].T.tolist():
+                oldLocation = None if column[OLD_HOLD] == 1 else tuple(column[OLD_Z:OLD_Y+1])
+                newLocation = None if column[NEW_HOLD] == 1 else tuple(column[NEW_Z:NEW_Y+1])
+                yield column[ID], oldLocation, newLocation
+
+    #Get a single movement as a module ID and two location objects, counts from zero.
+    def getMovement(self, stepNo):
+
+        if stepNo < 0:
+            stepNo += self.size
+        if stepNo < 0 or stepNo >= self.size:
+            raise IndexError('Movement ' + str(stepNo) + ' is not in the log')
+
+        column = [int(i) for i in self.data[:, stepNo]]
+
+        if column[OLD_HOLD] == 1:
+            oldLocation = Location('h', 'h', 'h')
+        else:
+            oldLocation = Location(column[OLD_Z], column[OLD_X], column[OLD_Y])
+        if column[NEW_HOLD] == 1:
+            newLocation = Location('h', 'h', 'h')
+        else:
+            newLocation = Location(column[NEW_Z], column[NEW_X], column[NEW_Y])
+
+        return column[ID], oldLocation, newLocation
+
+#Raised when a plan takes longer than the time it was given.
+class PlanningTimeout(Exception):
+    pass
+
+#Raised when a plan is no longer wanted, such as when a stream of movements is closed early.
+class PlanningCancelled(Exception):
+    pass
+
+#Measurements of where the time of a plan goes, kept with its movements so they can be logged with the plan.
+#Phases are timed as they run, along with the movements stored in them, and can be nested, a phase inside another
+#is named by the path to it such as 'meltInitial/sweep'. Counters count the work done, such as sweeps and lattice scans.
+class PlanningStats():
+
+    def __init__(self):
+
+        #Total time, number of runs and movements stored for each phase, by its path.
+        self.phases = {}
+        self.counters = {}
+
+        #Time spent storing movements, the checks and bookkeeping of every planning loop.
+        self.storeMovementTime = 0.0
+        self.storeMovementCalls = 0
+
+        #Functions called with 'start' or 'end', the path of the phase and these stats, see addHook.
+        self.hooks = []
+        self.currentPhases = []
+
+    #Time a phase while the with block runs. Movements stored to the movements given are counted against it.
+    @contextmanager
+    def phase(self, name, movements=None):
+
+        self.currentPhases.append(name)
+        path = '/'.join(self.currentPhases)
+        #Phases are added as they start, so the report lists them in the order they were first run.
+        if path not in self.phases:
+            self.phases[path] = {'time': 0.0, 'calls': 0, 'movements': 0}
+        for hook in self.hooks:
+            hook('start', path, self)
+
+        startMovements = movements.legnth() if movements != None else 0
+        startTime = time.perf_counter()
+        try:
+            yield
+        finally:
+            phaseTime = time.perf_counter() - startTime
+            self.phases[path]['time'] += phaseTime
+            self.phases[path]['calls'] += 1
+            if movements != None:
+                self.phases[path]['movements'] += movements.legnth() - startMovements
+
+            for hook in self.hooks:
+                hook('end', path, self)
+            self.currentPhases.pop()
+
+    #Add to a counter.
+    def count(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    #Call a function as every phase starts and ends, with 'start' or 'end', the path of the phase and these stats.
+    #Used to trace planning or to measure more than time, such as memory, around each phase.
+    def addHook(self, hook):
+        self.hooks.append(hook)
+
+    #Add the measurements of stats taken elsewhere, such as a melt made in another process.
+    def merge(self, otherStats):
+
+        for path, measurements in otherStats.phases.items():
+            if path not in self.phases:
+                self.phases[path] = {'time': 0.0, 'calls': 0, 'movements': 0}
+            for measurement in measurements:
+                self.phases[path][measurement] += measurements[measurement]
+
+        for name, amount in otherStats.counters.items():
+            self.count(name, amount)
+
+        self.storeMovementTime += otherStats.storeMovementTime
+        self.storeMovementCalls += otherStats.storeMovementCalls
+
+    #Get every measurement as a dictionary that can be written as JSON.
+    def getSummary(self):
+
+        return {'phases': {path: dict(measurements) for path, measurements in self.phases.items()},
+            'counters': dict(self.counters),
+            'storeMovement': {'time': self.storeMovementTime, 'calls': self.storeMovementCalls}}
+
+    #Get the measurements as lines of text, a line per phase indented by how deeply it is nested.
+    def getReport(self):
+
+        lines = []
+        for path, measurements in self.phases.items():
+            lines.append('  ' * path.count('/') + path.split('/')[-1] + ' ' + '%.4f' % measurements['time'] + 's, '
+                + str(measurements['calls']) + ' calls, ' + str(measurements['movements']) + ' movements')
+        lines.append('storeMovement ' + '%.4f' % self.storeMovementTime + 's, ' + str(self.storeMovementCalls) + ' calls')
+        for name, amount in self.counters.items():
+            lines.append(name + ' ' + str(amount))
+
+        return '\n'.join(lines)
+
+    #Hooks are often made for one run and cannot be copied to another process, so they are left behind.
+    def __getstate__(self):
+
+        state = dict(self.__dict__)
+        state['hooks'] = []
+        return state
+
 #The class created to solve various movement recording issues. 
 #Detects and stores all movements
 class Movements():
 
     #Initialise with a structure and a the default structure size. 
-    def __init__(self, initialStructure, widthOfLattice=10):
+    #With no structure, movements are not checked as they are stored, used for plans loaded from files.
+    def __init__(self, initialStructure=None, widthOfLattice=10):
 
-        self.movements = []
-        self.structure = np.zeros((widthOfLattice, widthOfLattice, widthOfLattice))
+        self.movements = MovementLog()
 
-        #Create an isolated object to store the structure in, preventing unwanted changes.
-        for voxel in np.nditer(initialStructure):
-            if voxel != 0:
-                self.structure[np.where(initialStructure==voxel)] = voxel
+        #Index the structure rather than copying it, so movements can be checked without searching the lattice.
+        self.index = ModuleIndex(initialStructure)
+        #The shape of the lattice, so movements outside it can be caught, None if there is no structure.
+        self.shape = None if initialStructure is None else tuple(int(i) for i in np.shape(initialStructure))
+        self.hold = set()
 
-    #Find the amount of movements in the array.
+        #A time.perf_counter() value to stop planning at, checked as each movement is stored.
+        self.deadline = None
+
+        #Functions called with every movement as it is stored, see addListener.
+        self.listeners = []
+
+        #Where the time of planning these movements went, see PlanningStats.
+        self.stats = PlanningStats()
+
+    #Find the amount of movements in the log.
     def legnth(self, string=False):
         if string == True:
-            return str(int(np.size(self.movements)/3))
+            return str(len(self.movements))
         else:
-            return int(np.size(self.movements)/3)
-
-    #Compares old/new array to store movement.
-    def storeMovement(self, newStructure, voxelMoved):
-
-        #Find out whats changed and if the voxel has entered the hold.
-        oldLocation = Location(0,0,0)
-        newLocation = Location(0,0,0)
-
-        #See if module is entering hold.
-        enteringHold = True 
-        for voxel in np.nditer(newStructure):
-            if voxel == voxelMoved:
-                enteringHold = False
-                break
-
-        #See if module is leaving hold.
-        leavingHold = True
-        for voxel in np.nditer(self.structure):
-            if voxel == voxelMoved:
-                leavingHold = False
-                break
-
-        #Store the hold movement if appropriate.
-        if enteringHold == True:
-            newLocation.setLocation('h','h','h')
-        elif enteringHold == False:
-            newLocation.setLocationWithTuple(np.where(newStructure==voxelMoved))
-
-        #Store the hold movement if appropriate.
-        if leavingHold == True:
-            oldLocation.setLocation('h','h','h')
-        elif leavingHold == False:
-            oldLocation.setLocationWithTuple(np.where(self.structure==voxelMoved))
-
-        #Store the movement
-        movement = []
-        movement.append(voxelMoved)
-        movement.append(oldLocation)
-        movement.append(newLocation)
-
-        #Append the movement to the movements array.
-        self.movements = np.append(self.movements, movement)
-        self.movements = np.reshape(self.movements, (-1, 3))
-
-        #Apply the movement to the stored structure
-        self.structure = applyMovement(self.structure, movement)
-
-    #Reverse that array for the grow phase. 
-    def flip(self):
+            return len(self.movements)
 
-        #Flip the order movements are carried out in.
-        self.movements = np.flip(self.movements, axis=0)
+    #Set how long, in seconds from now, movements can be stored for. None means there is no limit.
+    def setTimeLimit(self, timeLimit):
 
-        #Swap the old and new positions.
-        for step in self.movements:
+        if timeLimit == None:
+            self.deadline = None
+        else:
+            self.deadline = time.perf_counter() + timeLimit
+
+    #Set the stats the time of planning is measured in, so one PlanningStats can be shared by several movements objects.
+    def setStats(self, stats):
+        self.stats = stats
+
+    #Get the stats measuring where the time of planning these movements went.
+    def getStats(self):
+        return self.stats
+
+    #Store a movement the caller has made, locations are (z,x,y) tuples or None for the hold.
+    def storeMovement(self, voxelMoved, oldLocation, newLocation):
+
+        #Every planning loop stores a movement each time round, so this stops any of them running forever.
+        startTime = time.perf_counter()
+        if self.deadline != None and startTime > self.deadline:
+            raise PlanningTimeout('Planning took longer than the time limit')
+
+        voxelMoved = int(voxelMoved)
+        if oldLocation != None:
+            oldLocation = tuple(int(i) for i in oldLocation)
+        if newLocation != None:
+            newLocation = tuple(int(i) for i in newLocation)
+
+        #Check the movement can be written to the log.
+        if voxelMoved <= 0 or voxelMoved > np.iinfo(logType).max:
+            raise ValueError(str(voxelMoved) + ' is not a module ID the movement log can hold')
+
+        #Check both locations are in the lattice, a negative coordinate would wrap round to the other side of a structure array.
+        if self.shape != None:
+            for location in (oldLocation, newLocation):
+                if location != None and (len(location) != 3 or any(location[axis] < 0 or location[axis] >= self.shape[axis] for axis in range(3))):
+                    raise ValueError('Module ' + str(voxelMoved) + ' cannot move to or from ' + str(location) + ' as it is outside the lattice')
+
+        #Check the module is leaving where the index says it is, or the hold if that is where it is leaving.
+        if oldLocation == None:
+            if voxelMoved not in self.hold:
+                raise ValueError('Module ' + str(voxelMoved) + ' is not in the hold')
+        elif self.index.getTuple(voxelMoved) != oldLocation:
+            raise ValueError('Module ' + str(voxelMoved) + ' is not at ' + str(oldLocation))
+
+        #Check the space being moved into is free.
+        if newLocation != None and self.index.getID(newLocation) not in (0, voxelMoved):
+            raise ValueError('Module ' + str(voxelMoved) + ' cannot move to ' + str(newLocation) + ' as it is occupied')
+
+        #Append the movement to the movement log.
+        self.movements.append(voxelMoved, oldLocation, newLocation)
+
+        #Apply the movement to the index and the hold.
+        self.index.moveModule(voxelMoved, newLocation)
+        if oldLocation == None:
+            self.hold.remove(voxelMoved)
+        if newLocation == None:
+            self.hold.add(voxelMoved)
+
+        #Listeners are left out, their time is spent by whoever is using the plan.
+        self.stats.storeMovementTime += time.perf_counter() - startTime
+        self.stats.storeMovementCalls += 1
+
+        for listener in self.listeners:
+            listener(voxelMoved, oldLocation, newLocation)
+
+    #Call a function with the module ID, old location and new location of every movement stored from now on.
+    #Locations are (z,x,y) tuples or None for the hold, as they are given to storeMovement.
+    def addListener(self, listener):
+        self.listeners.append(listener)
+
+    #Store a batch of movements together, made in order, with the same checks as storing them one at a time.
+    def storeMovementBatch(self, modulesMoved, oldLocations, newLocations):
+
+        for voxelMoved, oldLocation, newLocation in zip(modulesMoved, oldLocations, newLocations):
+            self.storeMovement(voxelMoved, oldLocation, newLocation)
 
-            newLocation = step[1]
-            oldLocation = step[2]
+    #Reverse that array for the grow phase. 
+    def flip(self):
 
-            step[1] = oldLocation
-            step[2] = newLocation
+        #Flip the order movements are carried out in and swap the old and new positions.
+        self.movements.flip()
 
     #Combine two movements arrays, for after grow phase has been flipped. 
     def combine(self, newMovements):
 
-        for newMovement in newMovements.getMovements():
+        self.movements.extend(newMovements.getMovements())
 
-            self.movements = np.append(self.movements, newMovement)
-            self.movements = np.reshape(self.movements, (-1, 3))
-
-    #Get array of movements.
+    #Get the log of movements.
     def getMovements(self):
         return self.movements
     
     #Get a single movement, counts from zero.
     def getMovement(self, stepNo, string=False):
 
-        step = self.movements[stepNo]
-        moduleToMoveID = step[0]
-        oldLocation = step[1]
-        newLocation = step[2]
+        moduleToMoveID, oldLocation, newLocation = self.movements.getMovement(stepNo)
 
         if string == True:
             return str(moduleToMoveID), oldLocation.getString(), newLocation.getString
@@ -162,38 +623,84 @@ class Movements():
             return moduleToMoveID, oldLocation, newLocation
         
 #Creates an array to be stepped through after manipulation is compete for the GUI to display to the user.
+#Snapshots of the structure are kept every keyframeInterval steps as they are reached, so any step can be found by
+#going from the closest snapshot rather than from the start of the plan.
 class StepStructure():
 
     #Initialise with the initial structure, completed list of movements and the default lattice width.
-    def __init__(self, structure, movements, widthOfLattice = 10):
+    def __init__(self, structure, movements, widthOfLattice = 10, keyframeInterval = 256):
 
-        self.structure = structure
+        #Step through a copy, so the structure passed in is not changed.
+        self.structure = getCompactStructure(structure)
         self.step = 0
         self.movements = movements
         self.noOfSteps = self.movements.legnth(string=True)
 
+        self.keyframeInterval = keyframeInterval
+        self.keyframes = [self.getSnapshot()]
+
     #Move a step and keep track of where the step counter is.
     def moveStep(self, direction):
 
+        stepNo = self.step
         if direction == 'forward': 
-            self.step += 1
+            stepNo += 1
         elif direction == 'backward': 
-            self.step -= 1
+            stepNo -= 1
 
-        #Quit if reached last movement.
-        if self.step > self.movements.legnth(): 
-            self.step -= 1
-            return False, ''
-        if self.step < 0: 
-            self.step += 1
+        #Quit if reached first or last movement.
+        if stepNo > self.movements.legnth() or stepNo < 0:
             return False, ''
 
+        self.seek(stepNo)
+
+        return True, self.getMessage()
+
+    #Move to any step, 0 being the initial structure and the number of movements being the final structure.
+    def seek(self, stepNo):
+
+        if stepNo < 0 or stepNo > self.movements.legnth():
+            raise IndexError('Step ' + str(stepNo) + ' is not in the plan')
+
+        #Start from the closest snapshot at or before the step, unless the current step is closer.
+        keyframe = min(stepNo // self.keyframeInterval, len(self.keyframes) - 1)
+        if stepNo - keyframe*self.keyframeInterval < abs(stepNo - self.step):
+            self.setSnapshot(self.keyframes[keyframe])
+            self.step = keyframe*self.keyframeInterval
+
+        movementLog = self.movements.getMovements()
+
+        #Going forward, make each movement and take snapshots when they are due.
+        if stepNo > self.step:
+            for moduleID, oldLocation, newLocation in movementLog.getTuples(self.step, stepNo):
+                if oldLocation != None:
+                    self.structure[oldLocation] = 0
+                if newLocation != None:
+                    self.structure[newLocation] = moduleID
+                self.step += 1
+                if self.step == len(self.keyframes)*self.keyframeInterval:
+                    self.keyframes.append(self.getSnapshot())
+
+        #Going backward, undo each movement, moving the module from its new location back to its old one.
+        elif stepNo < self.step:
+            for moduleID, oldLocation, newLocation in reversed(list(movementLog.getTuples(stepNo, self.step))):
+                if newLocation != None:
+                    self.structure[newLocation] = 0
+                if oldLocation != None:
+                    self.structure[oldLocation] = moduleID
+            self.step = stepNo
+
+        return self.structure
+
+    #Get the message describing the last movement made, for the output box.
+    def getMessage(self):
+
+        if self.step == 0:
+            return 'Step 0/' + self.noOfSteps + ' Initial structure.'
+
         #Get individual movement objects using mrt.
         moduleToMoveID, oldLocation, newLocation = self.movements.getMovement(self.step-1)
 
-        #Make the movement, get total no of steps for display and increment counter.
-        self.structure = applyMovement(self.structure, self.movements.getMovement(self.step-1))
-
         #Prepare message for outbox showing what has happened.
         moduleToMoveID = str(moduleToMoveID)
         if newLocation.x == 'h':
@@ -203,21 +710,40 @@ class StepStructure():
         else:
             message = 'Step ' + str(self.step) + '/' + self.noOfSteps + ' Module ID:' + moduleToMoveID + ' moving to ' + newLocation.getString()
 
-        return True, message
+        return message
+
+    #Snapshots hold the coordinates and IDs of the modules, so they stay small for large lattices.
+    def getSnapshot(self):
+
+        if isinstance(self.structure, SparseStructure):
+            return self.structure.getCoordinates()
+
+        coordinates = np.argwhere(self.structure != 0)
+        return coordinates, self.structure[tuple(coordinates.T)]
+    def setSnapshot(self, snapshot):
+
+        coordinates, moduleIDs = snapshot
+        if isinstance(self.structure, SparseStructure):
+            self.structure = SparseStructure(self.structure.shape, coordinates, moduleIDs)
+        else:
+            self.structure[...] = 0
+            self.structure[tuple(coordinates.T)] = moduleIDs
     
     #REturn the raw structure for the voxel plots in the GUI.
     def getStructure(self): 
         return self.structure
 
 #Save an array as a text file.
-def saveArrayTxt(array, widthOfLattice=10, fileName='1'):
+def saveArrayTxt(array, widthOfLattice=None, fileName='1'):
 
+    array = getDenseStructure(array)
+    if widthOfLattice == None:
+        widthOfLattice = np.shape(array)[-1]
     array = np.reshape(array, (-1,widthOfLattice))
 
     try:
         filePath = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
-        np.savetxt(filePath+'/Test Structures/'+fileName+'.txt',
-            array,  fmt='%s', header='#ID, oldLocation(z,x,y), newLocation(z,x,y)#')
+        np.savetxt(filePath+'/Test Structures/'+fileName+'.txt', array, fmt='%d')
     except Exception as e:
         print(e)
         print('Save Failed - This is probably an issue with the .os dependency')
@@ -225,7 +751,8 @@ def saveArrayTxt(array, widthOfLattice=10, fileName='1'):
         sys.exit()
 
 #Load a previously saved text array. Used for the welcome structures. 
-def loadTxtArray(widthOfLattice=10, fileName='1'):
+#The lattice is assumed to be a cube, its width is found from the file if not given.
+def loadTxtArray(widthOfLattice=None, fileName='1'):
 
     try:
         filePath = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
@@ -234,10 +761,177 @@ def loadTxtArray(widthOfLattice=10, fileName='1'):
         print(e)
         print('Load failed')
 
+    if widthOfLattice == None:
+        widthOfLattice = int(round(np.size(array) ** (1/3)))
     array = np.reshape(array, ([widthOfLattice, widthOfLattice, widthOfLattice]))
 
+    #Text files are read as floats, store the IDs as integers.
+    array = getCompactStructure(array)
+
     return array
 
+#Load a structure from any file.
+#.npz files hold a sparse structure as its shape, coordinates and module IDs, .npy files hold a dense array
+#and any other file holds a dense array as text, laid out as saveArrayTxt writes it.
+def loadStructure(filePath, widthOfLattice=None):
+
+    if filePath.endswith('.npz'):
+        with np.load(filePath) as data:
+            return SparseStructure(data['shape'], data['coordinates'], data['moduleIDs'])
+
+    if filePath.endswith('.npy'):
+        array = np.load(filePath)
+    else:
+        array = np.loadtxt(filePath)
+
+        #The lattice is assumed to be a cube, its width is found from the file if not given.
+        if widthOfLattice == None:
+            widthOfLattice = int(round(np.size(array) ** (1/3)))
+        array = np.reshape(array, ([widthOfLattice, widthOfLattice, widthOfLattice]))
+
+    return getCompactStructure(array)
+
+#Save a structure to any file, the format is chosen by the extension as described in loadStructure.
+def saveStructure(filePath, structure):
+
+    if filePath.endswith('.npz'):
+        coordinates, moduleIDs = getSparseStructure(structure).getCoordinates()
+        np.savez(filePath, shape=np.array(structure.shape), coordinates=coordinates, moduleIDs=moduleIDs)
+    elif filePath.endswith('.npy'):
+        np.save(filePath, getCompactStructure(getDenseStructure(structure)))
+    else:
+        array = getDenseStructure(structure)
+        np.savetxt(filePath, np.reshape(array, (-1, np.shape(array)[-1])), fmt='%d')
+
+#Header used for plans saved as text, naming each column.
+planTxtHeader = 'ID oldZ oldX oldY newZ newX newY oldHold newHold'
+
+#Save the movements of a plan as text, one movement per line of integers, hold flags are the last two columns.
+def savePlanTxt(filePath, movements):
+    np.savetxt(filePath, movements.getMovements().getArray().T, fmt='%d', header=planTxtHeader)
+
+#Load the movements of a plan saved as text.
+def loadPlanTxt(filePath):
+
+    array = np.loadtxt(filePath, dtype=logType, ndmin=2).reshape(-1, noOfLogRows)
+
+    return getMovementsFromArray(array.T)
+
+#Binary plans start with a 64 byte header, followed by one record of 9 little endian 32 bit integers per movement.
+#Records are laid out as the rows of the log, so a movement can be read straight from the file by its step number.
+#If compressed, the records are held as a single zlib stream and are read back in full.
+planMagic = b'MSG-PLAN'
+planVersion = 1
+planCompressed = 1
+planRecordType = np.dtype('<i4')
+planHeaderType = np.dtype([('magic', 'S8'), ('version', '<u4'), ('flags', '<u4'), ('shape', '<i4', (3,)),
+    ('noOfModules', '<i8'), ('noOfSteps', '<i8'), ('reserved', 'V20')])
+
+#Save the movements of a plan as a binary file.
+#Structure is the initial structure, used to record the lattice size and module count in the header.
+#Without it they are found from the movements, the shape being the smallest lattice that holds every movement.
+def savePlanBinary(filePath, movements, structure=None, compress=False):
+
+    array = np.ascontiguousarray(movements.getMovements().getArray().T, dtype=planRecordType)
+
+    header = np.zeros(1, dtype=planHeaderType)
+    header['magic'] = planMagic
+    header['version'] = planVersion
+    header['noOfSteps'] = len(array)
+    if structure is None:
+        header['noOfModules'] = len(np.unique(array[:, ID]))
+        locations = np.concatenate([array[array[:, OLD_HOLD] == 0, OLD_Z:OLD_Y+1], array[array[:, NEW_HOLD] == 0, NEW_Z:NEW_Y+1]])
+        if len(locations) > 0:
+            header['shape'] = np.max(locations, axis=0) + 1
+    else:
+        header['shape'] = structure.shape
+        header['noOfModules'] = countModules(structure)
+    if compress == True:
+        header['flags'] = planCompressed
+
+    with open(filePath, 'wb') as planFile:
+        planFile.write(header.tobytes())
+        if compress == True:
+            #Compress a block of records at a time, so a second copy of a large plan is never held in memory.
+            compressor = zlib.compressobj()
+            for i in range(0, len(array), 65536):
+                planFile.write(compressor.compress(array[i:i+65536].tobytes()))
+            planFile.write(compressor.flush())
+        else:
+            array.tofile(planFile)
+
+#Read the header of a binary plan, as a dictionary of its fields.
+def readPlanHeader(filePath):
+
+    with open(filePath, 'rb') as planFile:
+        header = planFile.read(planHeaderType.itemsize)
+
+    if len(header) < planHeaderType.itemsize:
+        raise ValueError(filePath + ' is not a binary plan')
+    header = np.frombuffer(header, dtype=planHeaderType)
+    if header['magic'][0] != planMagic:
+        raise ValueError(filePath + ' is not a binary plan')
+    if header['version'][0] > planVersion:
+        raise ValueError(filePath + ' is a newer version of binary plan than can be read')
+
+    return {'version': int(header['version'][0]), 'flags': int(header['flags'][0]),
+        'shape': tuple(int(i) for i in header['shape'][0]), 'noOfModules': int(header['noOfModules'][0]),
+        'noOfSteps': int(header['noOfSteps'][0])}
+
+#Load the movements of a binary plan.
+#Uncompressed plans are memory mapped, so loading takes the same time for any size of plan and only the
+#movements that are used are read. The map is copy on write, changing the movements never changes the file.
+def loadPlanBinary(filePath, memoryMap=True):
+
+    header = readPlanHeader(filePath)
+    noOfSteps = header['noOfSteps']
+
+    if header['flags'] & planCompressed:
+        with open(filePath, 'rb') as planFile:
+            planFile.seek(planHeaderType.itemsize)
+            records = bytearray(zlib.decompress(planFile.read()))
+        array = np.frombuffer(records, dtype=planRecordType)
+    elif memoryMap == True and noOfSteps > 0:
+        array = np.memmap(filePath, dtype=planRecordType, mode='c', offset=planHeaderType.itemsize, shape=(noOfSteps*noOfLogRows,))
+    else:
+        array = np.fromfile(filePath, dtype=planRecordType, count=noOfSteps*noOfLogRows, offset=planHeaderType.itemsize)
+
+    if len(array) != noOfSteps*noOfLogRows:
+        raise ValueError(filePath + ' is missing movements')
+
+    return getMovementsFromArray(np.reshape(array, (noOfSteps, noOfLogRows)).T, copy=False)
+
+#Save a plan to any file, .txt files are saved as text by savePlanTxt and any other file is saved by savePlanBinary.
+def savePlan(filePath, movements, structure=None, compress=False):
+
+    if filePath.endswith('.txt'):
+        savePlanTxt(filePath, movements)
+    else:
+        savePlanBinary(filePath, movements, structure, compress)
+
+#Load a plan from any file, the format is chosen by the extension as described in savePlan.
+def loadPlan(filePath):
+
+    if filePath.endswith('.txt'):
+        return loadPlanTxt(filePath)
+    else:
+        return loadPlanBinary(filePath)
+
+#Create a movements object holding a log array, one row per column of integers as MovementLog.getArray gives.
+#Structure is the one left after the movements, so any stored after them are checked, None to not check them.
+#Without copying, the log uses the array as it is until movements are added to it.
+def getMovementsFromArray(array, structure=None, copy=True):
+
+    movements = Movements(structure)
+    if copy == True:
+        movements.movements.reserve(np.shape(array)[1])
+        movements.movements.data[:, :np.shape(array)[1]] = array
+    else:
+        movements.movements.data = array
+    movements.movements.size = np.shape(array)[1]
+
+    return movements
+
 #Apply a movement to a structure.
 def applyMovement(structure, movement):
 
@@ -252,27 +946,26 @@ def applyMovement(structure, movement):
 
     return structure
 
-#Load an array of movements stored in a text array.
+#Load movements stored in the movement cache by storeMovements.
 def loadTxtMovements(fileName='1'):
 
-    array = []
+    movements = None
 
     try:
         filePath = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
-        array = np.loadtxt(filePath+'/Movement Cache/'+fileName+'.txt')
+        movements = loadPlanTxt(filePath+'/Movement Cache/'+fileName+'.txt')
     except Exception as e:
         print(e)
         print('Load failed error 123')
 
-        return array
+    return movements
 
-#Store an array of movements as a text array.
+#Store movements in the movement cache as text, laid out as savePlanTxt writes them.
 def storeMovements(movements, taskID):
 
     try:
         filePath = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
-        np.savetxt(filePath+'/Movement Cache/'+taskID+'.txt',
-            movements, fmt='%s', header='#ID, oldLocation(z,x,y), newLocation(z,x,y)#')
+        savePlanTxt(filePath+'/Movement Cache/'+str(taskID)+'.txt', movements)
     except:
         print('Save Failed - This is probably an issue with the .os dependency')
         print('Ending Program...')
@@ -280,9 +973,10 @@ def storeMovements(movements, taskID):
 
 #Changes all the ID's in an array to 1, leaving only zeros and ones in the array.
 #Used for the color schemes of voxel plots.
-def getSingleArray(array, moduleID, widthOfLattice=10):
+def getSingleArray(array, moduleID, widthOfLattice=None):
 
-    singleArray = np.zeros((10,10,10))
+    array = getDenseStructure(array)
+    singleArray = np.zeros(np.shape(array))
 
     singleArray[np.where(array==moduleID)] = 1
 
@@ -297,5 +991,6 @@ colours = { 1: 'blue',
             6: 'yellow'}
 
 #Used to get a colour, ensuring they are the same throughout the program.
+#IDs past the last colour go round the colours again.
 def getColourOfModule(moduleID):
-    return colours[moduleID]
+    return colours[(int(moduleID) - 1) % len(colours) + 1]
@@ -0,0 +1,221 @@
+#Caching of plans and melts, so reconfigurations that have been planned before are not planned again.
+#Entries are kept in memory and, if given a folder, on disk so they last between runs and can be shared by processes.
+
+#Import dependencies.
+import hashlib
+import os
+from collections import OrderedDict
+import numpy as np
+import ModularRoboticsToolkit as mrt
+
+#Changed whenever the planner changes the plans it makes, so older cache entries are no longer used.
+cacheVersion = 1
+
+#Get a key for a structure, the same for a dense array and a sparse structure holding the same modules.
+def getStructureKey(structure):
+
+    coordinates, moduleIDs = mrt.getSparseStructure(structure).getCoordinates()
+    return getCoordinatesKey(structure.shape, coordinates, moduleIDs)
+
+#Get a key for the modules at a list of coordinates in a lattice, the coordinates must be sorted.
+def getCoordinatesKey(shape, coordinates, moduleIDs):
+
+    structureHash = hashlib.sha256()
+    structureHash.update(np.array(shape, dtype=np.int64).tobytes())
+    structureHash.update(np.ascontiguousarray(coordinates, dtype=np.int64).tobytes())
+    structureHash.update(np.ascontiguousarray(moduleIDs, dtype=np.int64).tobytes())
+
+    return structureHash.hexdigest()
+
+#Get a key for a plan between two structures, from their keys, the lattice width and the algorithm options used.
+def getPlanKey(initialKey, goalKey, widthOfLattice, options={}):
+
+    planHash = hashlib.sha256()
+    planHash.update(('plan ' + str(cacheVersion) + ' ' + initialKey + ' ' + goalKey + ' ' + str(widthOfLattice)).encode())
+    for option in sorted(options):
+        planHash.update((' ' + option + '=' + repr(options[option])).encode())
+
+    return planHash.hexdigest()
+
+#Get a key for the melt of a structure, from the structure's key.
+def getMeltKey(structureKey):
+    return hashlib.sha256(('melt ' + str(cacheVersion) + ' ' + structureKey).encode()).hexdigest()
+
+#Melt coordinates are stored as integers, with -1 representing the line along which to melt.
+def meltCoordinatesToArray(meltCoordinates):
+    return np.array([-1 if i == 'm' else int(i) for i in meltCoordinates.getTuple()], dtype=np.int64)
+def arrayToMeltCoordinates(array):
+    return mrt.Location(*['m' if i == -1 else int(i) for i in array])
+
+#A least recently used cache of plans and melts, limited to a number of entries.
+#Entries are copied in and out, so planning with a cached entry never changes it.
+#Plans and melts can be given a Symmetry.Transform, in which case they are stored in canonical space and mapped back
+#into the lattice when they are read, so they are shared by every structure with the same canonical form.
+class PlanCache():
+
+    #Initialise with a folder to keep entries in between runs, or None to keep them in memory only.
+    #maxEntries limits the entries kept in memory and on disk, maxBytes limits the size of the folder.
+    def __init__(self, folder=None, maxEntries=256, maxBytes=None):
+
+        self.folder = folder
+        self.maxEntries = maxEntries
+        self.maxBytes = maxBytes
+        self.entries = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+
+        if self.folder != None:
+            os.makedirs(self.folder, exist_ok=True)
+
+    #Find the amount of entries in memory.
+    def __len__(self):
+        return len(self.entries)
+
+    #Get the arrays stored for a key, from memory or disk, None if it is not cached.
+    def getEntry(self, key):
+
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.entries[key]
+
+        if self.folder != None:
+            filePath = self.getFilePath(key)
+            try:
+                with np.load(filePath) as data:
+                    entry = {name: data[name] for name in data.files}
+                #Mark the file as recently used, the oldest files are removed first.
+                os.utime(filePath)
+            except (OSError, ValueError, KeyError):
+                entry = None
+            if entry != None:
+                self.addToMemory(key, entry)
+                self.hits += 1
+                return entry
+
+        self.misses += 1
+        return None
+
+    #Store the arrays for a key, in memory and on disk.
+    def storeEntry(self, key, entry):
+
+        self.addToMemory(key, entry)
+
+        if self.folder != None:
+            #Write to a temporary file and rename it, so other processes never read a half written entry.
+            filePath = self.getFilePath(key)
+            temporaryPath = filePath + '.' + str(os.getpid()) + '.tmp'
+            with open(temporaryPath, 'wb') as file:
+                np.savez(file, **entry)
+            os.replace(temporaryPath, filePath)
+            self.evictFromDisk()
+
+    #Add an entry to memory, removing the least recently used entries if there are too many.
+    def addToMemory(self, key, entry):
+
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxEntries:
+            self.entries.popitem(last=False)
+
+    #Remove the least recently used files until the folder is within its limits.
+    def evictFromDisk(self):
+
+        files = []
+        for fileName in os.listdir(self.folder):
+            if fileName.endswith('.npz'):
+                filePath = os.path.join(self.folder, fileName)
+                try:
+                    fileStats = os.stat(filePath)
+                except OSError:
+                    continue
+                files.append((fileStats.st_mtime, fileStats.st_size, filePath))
+        files.sort()
+
+        totalBytes = sum(file[1] for file in files)
+        while len(files) > 0 and (len(files) > self.maxEntries or (self.maxBytes != None and totalBytes > self.maxBytes)):
+            lastUsed, fileSize, filePath = files.pop(0)
+            totalBytes -= fileSize
+            try:
+                os.remove(filePath)
+            except OSError:
+                pass
+
+    #Get the file an entry is kept in.
+    def getFilePath(self, key):
+        return os.path.join(self.folder, key + '.npz')
+
+    #Remove every entry, from memory and disk.
+    def clear(self):
+
+        self.entries.clear()
+        if self.folder != None:
+            for fileName in os.listdir(self.folder):
+                if fileName.endswith('.npz'):
+                    os.remove(os.path.join(self.folder, fileName))
+
+    #Get a cached plan as a new movements object, None if it is not cached or does not fit in the lattice.
+    def getPlan(self, key, transform=None):
+
+        entry = self.getEntry(key)
+        if entry == None:
+            return None
+
+        array = entry['movements']
+        if transform != None:
+            array = transform.invertLog(array)
+            if array is None:
+                return None
+
+        return mrt.getMovementsFromArray(array)
+
+    #Store a completed plan.
+    def storePlan(self, key, movements, transform=None):
+
+        array = np.copy(movements.getMovements().getArray())
+        if transform != None:
+            array = transform.applyToLog(array)
+
+        self.storeEntry(key, {'movements': array})
+
+    #Get a cached melt of a structure, as the melt coordinates, the melted structure and the movements made.
+    #The melted structure is dense or sparse to match the structure given. None if it is not cached or does not fit in the lattice.
+    def getMelt(self, key, structure, transform=None):
+
+        entry = self.getEntry(key)
+        if entry == None:
+            return None
+
+        if transform == None:
+            meltCoordinates = arrayToMeltCoordinates(entry['meltCoordinates'])
+            meltedStructure = mrt.SparseStructure(entry['shape'], entry['coordinates'], entry['moduleIDs'])
+            array = entry['movements']
+        else:
+            meltCoordinates = transform.invertMeltCoordinates(entry['meltCoordinates'])
+            meltedStructure = transform.invertStructure(entry['coordinates'], entry['moduleIDs'])
+            array = transform.invertLog(entry['movements'])
+            if meltCoordinates == None or meltedStructure == None or array is None:
+                return None
+
+        if not isinstance(structure, mrt.SparseStructure):
+            meltedStructure = meltedStructure.getDense()
+        movements = mrt.getMovementsFromArray(array, meltedStructure)
+
+        return meltCoordinates, meltedStructure, movements
+
+    #Store the melt of a structure.
+    def storeMelt(self, key, meltCoordinates, meltedStructure, movements, transform=None):
+
+        coordinates, moduleIDs = mrt.getSparseStructure(meltedStructure).getCoordinates()
+        array = np.copy(movements.getMovements().getArray())
+
+        if transform == None:
+            meltCoordinates = meltCoordinatesToArray(meltCoordinates)
+        else:
+            meltCoordinates = transform.applyToMeltCoordinates(meltCoordinates)
+            coordinates = transform.apply(coordinates)
+            array = transform.applyToLog(array)
+
+        self.storeEntry(key, {'meltCoordinates': meltCoordinates, 'shape': np.array(meltedStructure.shape),
+            'coordinates': coordinates, 'moduleIDs': moduleIDs, 'movements': array})
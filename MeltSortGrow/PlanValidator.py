@@ -0,0 +1,182 @@
+#Validation of plans, so they can be checked before being carried out by real modules.
+#The whole plan is replayed at once with array operations over the movement log rather than a movement at a time.
+
+#Import dependencies.
+import argparse
+import sys
+import time
+import numpy as np
+import ModularRoboticsToolkit as mrt
+
+#Cells are numbered through the lattice, with negative numbers for modules in the hold or not in the lattice at all.
+holdCell = -1
+absentCell = -2
+
+#The outcome of validating a plan. stepNo is the first movement that cannot be made, counting from zero,
+#or None if every movement can be made, in which case the plan can still fail to finish at the goal.
+class ValidationResult():
+
+    def __init__(self, valid, stepNo=None, message=''):
+        self.valid = valid
+        self.stepNo = stepNo
+        self.message = message
+
+#Get the IDs of the modules in a structure, sorted, and the cell each one is in.
+def getModuleCells(structure):
+
+    if isinstance(structure, mrt.SparseStructure):
+        coordinates, moduleIDs = structure.getCoordinates()
+    else:
+        coordinates = np.argwhere(structure != 0)
+        moduleIDs = structure[tuple(coordinates.T)]
+
+    moduleIDs = np.asarray(moduleIDs, dtype=np.int64)
+    cells = np.ravel_multi_index(tuple(np.asarray(coordinates, dtype=np.int64).T), structure.shape) if len(moduleIDs) > 0 else np.zeros(0, dtype=np.int64)
+
+    order = np.argsort(moduleIDs, kind='stable')
+    return moduleIDs[order], cells[order]
+
+#Find the value for each key in a sorted list of keys, or a default where the key is not in the list.
+def lookUp(sortedKeys, values, keys, default):
+
+    positions = np.minimum(np.searchsorted(sortedKeys, keys), max(len(sortedKeys) - 1, 0))
+    found = np.zeros(len(keys), dtype=bool)
+    if len(sortedKeys) > 0:
+        found = sortedKeys[positions] == keys
+
+    result = np.full(len(keys), default, dtype=np.int64)
+    result[found] = values[positions[found]]
+    return result
+
+#Check a plan can be carried out from the initial structure and that it finishes at the goal structure.
+#Each movement must start where its module is, stay inside the lattice and move into a free cell,
+#and modules can only leave the hold if they are in it. Movements can be a Movements object or a log array.
+#Without a goal structure only the movements are checked.
+def validatePlan(initialStructure, goalStructure, movements):
+
+    array = movements
+    if isinstance(movements, mrt.Movements):
+        array = movements.getMovements().getArray()
+    noOfSteps = np.shape(array)[1]
+    shape = np.array(initialStructure.shape, dtype=np.int64)
+
+    moduleIDs = np.asarray(array[mrt.ID], dtype=np.int64)
+    oldInHold = array[mrt.OLD_HOLD] == 1
+    newInHold = array[mrt.NEW_HOLD] == 1
+    oldCoordinates = np.asarray(array[mrt.OLD_Z:mrt.OLD_Y+1], dtype=np.int64).T
+    newCoordinates = np.asarray(array[mrt.NEW_Z:mrt.NEW_Y+1], dtype=np.int64).T
+
+    #The first step that breaks each rule, the earliest of them is the first step that cannot be made.
+    #Every step before it is valid, so the state found from those steps is the state the lattice is really in.
+    firstViolations = []
+
+    ###BOUNDS###
+    oldOutside = ~oldInHold & np.any((oldCoordinates < 0) | (oldCoordinates >= shape), axis=1)
+    newOutside = ~newInHold & np.any((newCoordinates < 0) | (newCoordinates >= shape), axis=1)
+    outside = np.flatnonzero(oldOutside | newOutside)
+    if len(outside) > 0:
+        stepNo = int(outside[0])
+        firstViolations.append((stepNo, 'Module ' + str(moduleIDs[stepNo]) + ' moves outside of the lattice'))
+
+    #Number the cells, steps outside of the lattice have already failed so any cell will do for them.
+    oldCells = np.ravel_multi_index(tuple(oldCoordinates.T), tuple(shape), mode='clip')
+    newCells = np.ravel_multi_index(tuple(newCoordinates.T), tuple(shape), mode='clip')
+    oldCells[oldInHold] = holdCell
+    newCells[newInHold] = holdCell
+
+    ###MODULES###
+    #Follow each module through its movements, every movement must start where the one before it finished.
+    initialIDs, initialCells = getModuleCells(initialStructure)
+    order = np.argsort(moduleIDs, kind='stable')
+    sortedIDs = moduleIDs[order]
+    firstOfModule = np.ones(noOfSteps, dtype=bool)
+    firstOfModule[1:] = sortedIDs[1:] != sortedIDs[:-1]
+
+    previousCells = np.empty(noOfSteps, dtype=np.int64)
+    previousCells[1:] = newCells[order][:-1]
+    previousCells[firstOfModule] = lookUp(initialIDs, initialCells, sortedIDs[firstOfModule], absentCell)
+
+    misplaced = np.flatnonzero((oldCells[order] != previousCells) | (sortedIDs <= 0))
+    if len(misplaced) > 0:
+        stepNo = int(np.min(order[misplaced]))
+        if oldInHold[stepNo]:
+            firstViolations.append((stepNo, 'Module ' + str(moduleIDs[stepNo]) + ' is not in the hold'))
+        else:
+            firstViolations.append((stepNo, 'Module ' + str(moduleIDs[stepNo]) + ' is not at ' + str(tuple(oldCoordinates[stepNo]))))
+
+    ###COLLISIONS###
+    #Follow each cell through the modules leaving and entering it, a module leaving in the same step is counted first.
+    leaving = np.flatnonzero(oldCells >= 0)
+    entering = np.flatnonzero(newCells >= 0)
+    eventCells = np.concatenate([oldCells[leaving], newCells[entering]])
+    eventSteps = np.concatenate([leaving, entering])
+    eventChanges = np.concatenate([np.full(len(leaving), -1), np.ones(len(entering), dtype=np.int64)])
+
+    eventOrder = np.lexsort((eventChanges, eventSteps, eventCells))
+    eventCells = eventCells[eventOrder]
+    eventSteps = eventSteps[eventOrder]
+    eventChanges = eventChanges[eventOrder]
+
+    #Count the modules in each cell after each event, starting from the initial structure.
+    firstOfCell = np.ones(len(eventCells), dtype=bool)
+    firstOfCell[1:] = eventCells[1:] != eventCells[:-1]
+    totals = np.cumsum(eventChanges)
+    cellStarts = np.flatnonzero(firstOfCell)
+    totalsBefore = (totals - eventChanges)[cellStarts]
+    initialOccupancy = np.isin(eventCells[cellStarts], initialCells).astype(np.int64)
+    occupancy = totals - np.repeat(totalsBefore - initialOccupancy, np.diff(np.append(cellStarts, len(eventCells))))
+
+    collisions = np.flatnonzero((eventChanges == 1) & (occupancy > 1))
+    if len(collisions) > 0:
+        stepNo = int(np.min(eventSteps[collisions]))
+        firstViolations.append((stepNo, 'Module ' + str(moduleIDs[stepNo]) + ' moves into ' + str(tuple(newCoordinates[stepNo])) + ' which is occupied'))
+
+    if len(firstViolations) > 0:
+        stepNo, message = min(firstViolations, key=lambda violation: violation[0])
+        return ValidationResult(False, stepNo, 'Step ' + str(stepNo) + ': ' + message)
+
+    ###GOAL###
+    if goalStructure is not None:
+
+        if tuple(goalStructure.shape) != tuple(initialStructure.shape):
+            return ValidationResult(False, None, 'The goal structure is not the same size as the initial structure')
+
+        #Every module finishes where its last movement took it, or where it started if it never moved.
+        finalCells = np.copy(initialCells)
+        lastOfModule = np.ones(noOfSteps, dtype=bool)
+        lastOfModule[:-1] = sortedIDs[1:] != sortedIDs[:-1]
+        finalCells[np.searchsorted(initialIDs, sortedIDs[lastOfModule])] = newCells[order][lastOfModule]
+
+        goalIDs, goalCells = getModuleCells(goalStructure)
+        if not np.array_equal(initialIDs, goalIDs):
+            return ValidationResult(False, None, 'The goal structure does not have the same modules as the initial structure')
+
+        wrongModules = initialIDs[finalCells != goalCells]
+        if len(wrongModules) > 0:
+            return ValidationResult(False, None, str(len(wrongModules)) + ' modules do not finish at the goal, such as module ' + str(wrongModules[0]))
+
+    return ValidationResult(True, None, 'All ' + str(noOfSteps) + ' movements are valid')
+
+#Command line entry point, returns 0 if the plan is valid and 1 if it is not.
+def main(arguments=None):
+
+    parser = argparse.ArgumentParser(description='Check a Melt Sort Grow plan can be carried out and finishes at the goal.')
+    parser.add_argument('initialFile', help='initial structure, .txt, .npy or sparse .npz')
+    parser.add_argument('goalFile', help='goal structure, .txt, .npy or sparse .npz')
+    parser.add_argument('planFile', help='plan, as text if .txt, otherwise binary')
+    arguments = parser.parse_args(arguments)
+
+    initialStructure = mrt.loadStructure(arguments.initialFile)
+    goalStructure = mrt.loadStructure(arguments.goalFile)
+    movements = mrt.loadPlan(arguments.planFile)
+
+    startTime = time.perf_counter()
+    result = validatePlan(initialStructure, goalStructure, movements)
+    validationTime = time.perf_counter() - startTime
+
+    print(result.message + ' (' + '%.3f' % validationTime + 's)')
+
+    return 0 if result.valid == True else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,58 @@
+#Headless planning, for running Melt Sort Grow without the GUI.
+#Only NumPy is needed, so this starts quickly and can be run on servers.
+
+#Import dependencies.
+import argparse
+import time
+import ModularRoboticsToolkit as mrt
+import MeltSortGrow as msg
+import PlanCache as pc
+
+#Plan a reconfiguration between two structures, which can be dense arrays or sparse structures.
+#planCache is a PlanCache.PlanCache to reuse earlier plans from, None to always plan from scratch.
+def plan(initialStructure, goalStructure, allignMode='greedy', planCache=None):
+
+    meltSuccsessful, movements = msg.main(initialStructure, goalStructure, allignMode=allignMode, planCache=planCache)
+
+    return movements
+
+#Read the initial and goal structures from files, plan the reconfiguration and write the plan to a file.
+#See mrt.loadStructure for the structure file formats and mrt.savePlan for the plan file formats.
+def planFromFiles(initialFile, goalFile, planFile, allignMode='greedy', planCache=None, compress=False):
+
+    initialStructure = mrt.loadStructure(initialFile)
+    goalStructure = mrt.loadStructure(goalFile)
+
+    movements = plan(initialStructure, goalStructure, allignMode, planCache)
+    mrt.savePlan(planFile, movements, initialStructure, compress)
+
+    return movements
+
+#Command line entry point.
+def main(arguments=None):
+
+    parser = argparse.ArgumentParser(description='Plan a Melt Sort Grow reconfiguration between two structures.')
+    parser.add_argument('initialFile', help='initial structure, .txt, .npy or sparse .npz')
+    parser.add_argument('goalFile', help='goal structure, .txt, .npy or sparse .npz')
+    parser.add_argument('planFile', help='file to write the plan to, as text if .txt, otherwise binary')
+    parser.add_argument('--allign', default='greedy', choices=['greedy', 'optimal'],
+        help='how the melt lines are alligned (default: greedy)')
+    parser.add_argument('--compress', action='store_true', help='compress a binary plan')
+    parser.add_argument('--cache', default=None, help='folder to keep plans in, so repeated plans are not planned again')
+    parser.add_argument('--stats', action='store_true', help='print where the planning time went, phase by phase')
+    arguments = parser.parse_args(arguments)
+
+    planCache = None
+    if arguments.cache != None:
+        planCache = pc.PlanCache(arguments.cache)
+
+    startTime = time.perf_counter()
+    movements = planFromFiles(arguments.initialFile, arguments.goalFile, arguments.planFile, arguments.allign, planCache, arguments.compress)
+    planningTime = time.perf_counter() - startTime
+
+    print('Planned ' + movements.legnth(string=True) + ' movements in ' + '%.3f' % planningTime + 's')
+    if arguments.stats == True:
+        print(movements.getStats().getReport())
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,220 @@
+#Generation of random connected structures, for testing the planner on more than hand drawn structures.
+#Every structure comes from a seed, so the same corpus of (initial, goal) pairs can be made again at any time.
+
+#Import dependencies.
+import argparse
+import os
+import math
+import numpy as np
+import ModularRoboticsToolkit as mrt
+
+#The six faces of a voxel, modules are connected if they share a face.
+faces = np.array([(1, 0, 0), (-1, 0, 0), (0, 1, 0), (0, -1, 0), (0, 0, 1), (0, 0, -1)])
+
+#Get the neighbours of a cell that are in the lattice.
+def getNeighbours(cell, shape):
+
+    neighbours = np.array(cell) + faces
+    inLattice = np.all((neighbours >= 0) & (neighbours < np.array(shape)), axis=1)
+    return [tuple(int(i) for i in neighbour) for neighbour in neighbours[inLattice]]
+
+#Take a connected set of cells from a shape, by searching outwards from a starting cell until there are enough.
+#The cells of the shape must all be connected to the start, or fewer cells than asked for are returned.
+def getConnectedCells(cells, noOfModules, start):
+
+    cells = set(map(tuple, np.asarray(cells).tolist()))
+    start = tuple(start)
+    found = [start]
+    seen = {start}
+
+    position = 0
+    while position < len(found) and len(found) < noOfModules:
+        for neighbour in np.array(found[position]) + faces:
+            neighbour = tuple(int(i) for i in neighbour)
+            if neighbour in cells and neighbour not in seen:
+                seen.add(neighbour)
+                found.append(neighbour)
+                if len(found) == noOfModules:
+                    break
+        position += 1
+
+    return np.array(found[:noOfModules], dtype=np.int64)
+
+#Move a set of cells to a random place in the lattice, raising ValueError if they do not fit in it.
+def placeRandomly(rng, cells, shape):
+
+    cells = cells - np.min(cells, axis=0)
+    size = np.max(cells, axis=0) + 1
+    if np.any(size > np.array(shape)):
+        raise ValueError('A ' + 'x'.join(str(int(i)) for i in size) + ' shape does not fit in the lattice')
+
+    offset = [rng.integers(0, shape[axis] - size[axis] + 1) for axis in range(3)]
+    return cells + np.array(offset)
+
+#A random walk, each module is added next to a randomly chosen module already in the structure.
+def randomWalk(rng, noOfModules, shape):
+
+    start = tuple(int(rng.integers(0, shape[axis])) for axis in range(3))
+    cells = [start]
+    occupied = {start}
+
+    while len(cells) < noOfModules:
+        cell = np.array(cells[rng.integers(len(cells))]) + faces[rng.integers(len(faces))]
+        cell = tuple(int(i) for i in cell)
+        if cell not in occupied and all(0 <= cell[axis] < shape[axis] for axis in range(3)):
+            occupied.add(cell)
+            cells.append(cell)
+
+    return np.array(cells, dtype=np.int64)
+
+#A compact blob, each module is added to a randomly chosen free cell next to the structure.
+def blob(rng, noOfModules, shape):
+
+    start = tuple(int(shape[axis] // 2) for axis in range(3))
+    cells = [start]
+    occupied = {start}
+    frontier = [cell for cell in getNeighbours(start, shape)]
+
+    while len(cells) < noOfModules:
+        cell = frontier.pop(rng.integers(len(frontier)))
+        if cell in occupied:
+            continue
+        occupied.add(cell)
+        cells.append(cell)
+        frontier.extend(neighbour for neighbour in getNeighbours(cell, shape) if neighbour not in occupied)
+
+    return placeRandomly(rng, np.array(cells, dtype=np.int64), shape)
+
+#A tower standing on the first axis, on a square base at least two modules wide so it is never a single line.
+#The base is as wide as the cube root of the number of modules, so the tower is at least as tall as it is wide,
+#and wider if the lattice is not tall enough. It is filled a level at a time, so only the top level is partly filled.
+def tower(rng, noOfModules, shape):
+
+    base = 2
+    while (base + 1)**3 <= noOfModules:
+        base += 1
+    while math.ceil(noOfModules / base**2) > shape[0]:
+        base += 1
+    height = math.ceil(noOfModules / base**2)
+
+    cells = np.argwhere(np.ones((height, base, base), dtype=bool))[:noOfModules]
+
+    return placeRandomly(rng, cells, shape)
+
+#A flat sheet one module thick lying across a random axis, as square as the lattice allows.
+def sheet(rng, noOfModules, shape):
+
+    width = min(math.ceil(math.sqrt(noOfModules)), min(shape))
+    dimensions = [width, width, width]
+    dimensions[rng.integers(3)] = 1
+    dimensions[dimensions.index(width)] = math.ceil(noOfModules / width)
+    cells = np.argwhere(np.ones(dimensions, dtype=bool))
+
+    return placeRandomly(rng, getConnectedCells(cells, noOfModules, (0, 0, 0)), shape)
+
+#The surface of the smallest cube with room for every module, filled from one corner.
+def hollowShell(rng, noOfModules, shape):
+
+    side = 1
+    while side**3 - max(side - 2, 0)**3 < noOfModules:
+        side += 1
+
+    box = np.ones((side, side, side), dtype=bool)
+    box[1:-1, 1:-1, 1:-1] = False
+    cells = np.argwhere(box)
+
+    return placeRandomly(rng, getConnectedCells(cells, noOfModules, (0, 0, 0)), shape)
+
+#Every kind of structure that can be generated.
+kinds = {'walk': randomWalk, 'blob': blob, 'tower': tower, 'sheet': sheet, 'shell': hollowShell}
+
+#Generate a connected structure of a kind in a cubic lattice, with module IDs from 1 to the number of modules.
+#Seed can be anything np.random.default_rng takes, or a generator to draw from.
+def generateStructure(kind, noOfModules, widthOfLattice, seed=None, sparse=False):
+
+    rng = np.random.default_rng(seed)
+    shape = (widthOfLattice, widthOfLattice, widthOfLattice)
+    if noOfModules > widthOfLattice**3:
+        raise ValueError(str(noOfModules) + ' modules do not fit in the lattice')
+
+    cells = kinds[kind](rng, noOfModules, shape)
+    moduleIDs = rng.permutation(noOfModules) + 1
+
+    if sparse == True:
+        return mrt.SparseStructure(shape, cells, moduleIDs)
+
+    structure = np.zeros(shape, dtype=mrt.getIDType(noOfModules))
+    structure[tuple(cells.T)] = moduleIDs
+    return structure
+
+#Generate an initial and goal structure with the same modules, the goal is of the same kind unless another is given.
+def generatePair(kind, noOfModules, widthOfLattice, seed=None, sparse=False, goalKind=None):
+
+    rng = np.random.default_rng(seed)
+    if goalKind == None:
+        goalKind = kind
+
+    initialStructure = generateStructure(kind, noOfModules, widthOfLattice, rng, sparse)
+    goalStructure = generateStructure(goalKind, noOfModules, widthOfLattice, rng, sparse)
+
+    return initialStructure, goalStructure
+
+#Write a corpus of pairs to a folder, with a job list naming each pair that BatchPlanner can read.
+#There are pairsPerSize pairs of every kind for every (lattice width, number of modules) size.
+#Pair i of a kind and size always comes from the same seed, so corpora made with the same seed match.
+def generateCorpus(folder, sizes, kindNames=None, pairsPerSize=1, seed=0, extension='.npz'):
+
+    if kindNames == None:
+        kindNames = list(kinds)
+
+    os.makedirs(folder, exist_ok=True)
+    jobs = []
+
+    for widthOfLattice, noOfModules in sizes:
+
+        #The planner melts every module into a single line of the lattice.
+        if noOfModules > widthOfLattice:
+            raise ValueError('Melt Sort Grow needs no more modules than the width of the lattice, ' + str(noOfModules) + ' > ' + str(widthOfLattice))
+
+        for kind in kindNames:
+            for pairNo in range(pairsPerSize):
+
+                pairSeed = (seed, widthOfLattice, noOfModules, list(kinds).index(kind), pairNo)
+                initialStructure, goalStructure = generatePair(kind, noOfModules, widthOfLattice, pairSeed, sparse=True)
+
+                jobID = kind + '-w' + str(widthOfLattice) + '-n' + str(noOfModules) + '-' + str(pairNo)
+                mrt.saveStructure(os.path.join(folder, jobID + '-initial' + extension), initialStructure)
+                mrt.saveStructure(os.path.join(folder, jobID + '-goal' + extension), goalStructure)
+                jobs.append(jobID)
+
+    with open(os.path.join(folder, 'jobs.txt'), 'w') as jobList:
+        jobList.write('#Job ID, initial structure, goal structure\n')
+        for jobID in jobs:
+            jobList.write(jobID + ' ' + jobID + '-initial' + extension + ' ' + jobID + '-goal' + extension + '\n')
+
+    return jobs
+
+#Command line entry point.
+def main(arguments=None):
+
+    parser = argparse.ArgumentParser(description='Generate a corpus of random structure pairs for Melt Sort Grow.')
+    parser.add_argument('folder', help='folder to write the structures and job list to')
+    parser.add_argument('--widths', type=int, nargs='+', default=[10, 20, 40], help='lattice widths')
+    parser.add_argument('--modules', type=int, nargs='+', default=None,
+        help='numbers of modules, each used with every width it fits in (default: the width of the lattice)')
+    parser.add_argument('--kinds', nargs='+', default=list(kinds), choices=list(kinds))
+    parser.add_argument('--pairs', type=int, default=1, help='pairs of each kind and size')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--format', default='.npz', choices=['.npz', '.npy', '.txt'], help='structure file format')
+    arguments = parser.parse_args(arguments)
+
+    if arguments.modules == None:
+        sizes = [(width, width) for width in arguments.widths]
+    else:
+        sizes = [(width, modules) for width in arguments.widths for modules in arguments.modules if modules <= width]
+
+    jobs = generateCorpus(arguments.folder, sizes, arguments.kinds, arguments.pairs, arguments.seed, arguments.format)
+    print('Generated ' + str(len(jobs)) + ' pairs in ' + arguments.folder)
+
+if __name__ == '__main__':
+    main()
@@ -8,180 +8,457 @@ import math
 import numpy as np
 import ModularRoboticsToolkit as mrt
 
-#Used to create an instance of the screen.
-def createScreen(screen, font):
+#The structure is drawn in a square area of the window, with the menu bar to the right of it.
+gridSize = 1000
+menuWidth = 100
 
-    #Set the window colour and update the display.
-    screen.fill((dark))
-    pg.display.update()
-    pg.display.flip()
+#Which part of a level is shown and how large each voxel is drawn.
+#The view can be zoomed and panned, so lattices of any size can be edited in the same window.
+class EditorView():
+
+    #Initialise with the shape of the array being edited, fitting a whole level in the grid area.
+    def __init__(self, shape):
+
+        self.shape = shape
+        self.cellSize = max(1, gridSize // max(shape[1], shape[2]))
+        self.row = 0
+        self.column = 0
+        self.grid = None
+
+    #Get the number of rows and columns of voxels that can be seen.
+    def getVisible(self):
+
+        rows = min(self.shape[1] - self.row, math.ceil(gridSize / self.cellSize))
+        columns = min(self.shape[2] - self.column, math.ceil(gridSize / self.cellSize))
+        return rows, columns
+
+    #Is a voxel in view.
+    def isVisible(self, row, column):
+
+        rows, columns = self.getVisible()
+        return self.row <= row < self.row + rows and self.column <= column < self.column + columns
+
+    #Get the row and column of the voxel at a point on the screen, None if there is no voxel there.
+    def getCell(self, pos):
+
+        if pos[0] >= gridSize or pos[1] >= gridSize:
+            return None
+
+        row = self.row + pos[1] // self.cellSize
+        column = self.column + pos[0] // self.cellSize
+        if row >= self.shape[1] or column >= self.shape[2]:
+            return None
+
+        return row, column
+
+    #Get the area of the screen a voxel is drawn in, inside the grid lines.
+    def getRect(self, row, column):
+
+        lineWidth = self.getLineWidth()
+        return pg.Rect((column - self.column)*self.cellSize + lineWidth, (row - self.row)*self.cellSize + lineWidth,
+            self.cellSize - lineWidth, self.cellSize - lineWidth)
+
+    #Grid lines are thinner when zoomed out, and not drawn at all when voxels are too small to see them.
+    def getLineWidth(self):
+
+        if self.cellSize >= 20:
+            return 2
+        elif self.cellSize >= 6:
+            return 1
+        return 0
+
+    #Zoom in or out by a factor, keeping the voxel under a point on the screen where it is.
+    def zoom(self, factor, pos):
+
+        cellSize = int(min(max(round(self.cellSize * factor), 1), gridSize))
+        if cellSize == self.cellSize:
+            return False
+
+        row = self.row + pos[1] / self.cellSize
+        column = self.column + pos[0] / self.cellSize
+        self.cellSize = cellSize
+        self.grid = None
+        self.row = int(row - pos[1] / self.cellSize)
+        self.column = int(column - pos[0] / self.cellSize)
+        self.pan(0, 0)
+
+        return True
+
+    #Move the view by a number of rows and columns, stopping at the edges of the lattice.
+    def pan(self, rows, columns):
+
+        visible = math.floor(gridSize / self.cellSize)
+        row = min(max(self.row + rows, 0), max(self.shape[1] - visible, 0))
+        column = min(max(self.column + columns, 0), max(self.shape[2] - visible, 0))
+
+        moved = (row, column) != (self.row, self.column)
+        self.row = row
+        self.column = column
+
+        return moved
+
+    #Get the grid lines for the current zoom, drawn once and kept until the zoom changes.
+    def getGrid(self):
+
+        if self.grid is None:
+
+            self.grid = pg.Surface((gridSize, gridSize))
+            self.grid.fill(dark)
+            self.grid.set_colorkey(dark)
 
-    #By taking advantage of the symmetry, draw the grid in which
-    #the structure can be drawn.
-    counter = 0
-    while counter <= 1000:
-        pg.draw.line(screen, blue, (0, counter), (1000, counter), 2)
-        counter+=100
-        
-    counter = 0
-    while counter <= 1000:
-        pg.draw.line(screen, blue, (counter, 0), (counter, 1000), 2)
-        counter+=100
-
-    #Draw the rest of the borders of the grid.
-    pg.draw.line(screen, blue, (0, 998), (1000, 998), 2)
-    pg.draw.line(screen, lightGrey, (1052, 0), (1052, 1000), 100)
+            lineWidth = self.getLineWidth()
+            rows = min(self.shape[1], math.ceil(gridSize / self.cellSize))
+            columns = min(self.shape[2], math.ceil(gridSize / self.cellSize))
+            if lineWidth > 0:
+                for counter in range(rows + 1):
+                    pg.draw.line(self.grid, blue, (0, counter*self.cellSize), (columns*self.cellSize, counter*self.cellSize), lineWidth)
+                for counter in range(columns + 1):
+                    pg.draw.line(self.grid, blue, (counter*self.cellSize, 0), (counter*self.cellSize, rows*self.cellSize), lineWidth)
+
+        return self.grid
+
+#Pre-render the menu bar, which does not change while editing, so it is only drawn once.
+def createBackground(font):
+
+    #Set the window colour.
+    background = pg.Surface((gridSize + menuWidth, gridSize))
+    background.fill((dark))
+
+    #Draw the menu bar.
+    pg.draw.line(background, lightGrey, (gridSize + 52, 0), (gridSize + 52, gridSize), 100)
 
     #Draw the navigational arrows.
     down = font.render(str('↑'), False, white)
     up = font.render(str('↓'), False, white)
-    screen.blit(down, (1025, 110))
-    screen.blit(up, (1025, 210))
+    background.blit(down, (gridSize + 25, 110))
+    background.blit(up, (gridSize + 25, 210))
 
     #Draw the quit button.
     quit = font.render(str('Q'), False, white)
-    screen.blit(quit, (1025, 310))
+    background.blit(quit, (gridSize + 25, 310))
 
     #Draw the module ID selection buttons.
-    voxelTypeOne = font.render(str('1'), False, white)
-    screen.blit(voxelTypeOne, (1025, 410))
-    voxelTypeTwo = font.render(str('2'), False, white)
-    screen.blit(voxelTypeTwo, (1025, 510))
-    voxelTypeThree = font.render(str('3'), False, white)
-    screen.blit(voxelTypeThree, (1025, 610))
-    voxelTypeFour = font.render(str('4'), False, white)
-    screen.blit(voxelTypeFour, (1025, 710))
-    voxelTypeFive = font.render(str('5'), False, white)
-    screen.blit(voxelTypeFive, (1025, 810))
-    voxelTypeSix = font.render(str('6'), False, white)
-    screen.blit(voxelTypeSix, (1025, 910))
-
-    #Update the screen and return it to the main program.
-    pg.display.update()
-    pg.display.flip()
-    return screen
+    for moduleType in range(1, 7):
+        voxelType = font.render(str(moduleType), False, white)
+        background.blit(voxelType, (gridSize + 25, 310 + moduleType*100))
 
-#Draw the newly selected level.
-def drawLevel(array, levelCounter, screen):
+    return background
 
-    counter = 0
-    rowCounter = 0
+#Used to create an instance of the screen, from the pre-rendered background.
+def createScreen(screen, background):
 
-    #Get the array splice that for the desired level.
-    arraySplice = array[levelCounter]
+    #Copy the background to the screen and show all of it.
+    screen.blit(background, (0, 0))
+    pg.display.flip()
+    return screen
 
-    #Draw the splice.
-    for row in arraySplice:
-        for voxel in row:
+#Draw the part of the selected level that is in view, returning the area of the screen that has changed.
+#The voxels are coloured as an image, one pixel per voxel, which is then scaled up to the zoom.
+def drawLevel(array, levelCounter, screen, view):
 
-            if voxel != 0:
-                pg.draw.rect(screen, mrt.getColourOfModule(voxel), [counter*100+2, rowCounter*100+2, 98, 98])
-            counter += 1
+    gridArea = pg.Rect(0, 0, gridSize, gridSize)
+    screen.fill(dark, gridArea)
 
-        counter = 0
-        rowCounter += 1
+    rows, columns = view.getVisible()
+    arraySplice = array[levelCounter, view.row:view.row+rows, view.column:view.column+columns]
 
-    #Update the display.
-    pg.display.update()
-    pg.display.flip()
+    colourIndex = np.where(arraySplice != 0, (arraySplice.astype(np.int64) - 1) % (len(palette) - 1) + 1, 0)
+    image = pg.surfarray.make_surface(np.transpose(palette[colourIndex], (1, 0, 2)))
+    image = pg.transform.scale(image, (columns*view.cellSize, rows*view.cellSize))
 
-#Contains the main loop which runs while a structure is being edited. 
-def makerLoop(screen, levelCounter, array, font):
+    screen.blit(image, (0, 0), gridArea)
+    screen.blit(view.getGrid(), (0, 0))
 
-    #Set an initial module type to put down when the user clicks.
-    moduleType = 1
+    return gridArea
 
-    #MAIN LOOP
-    run = True
-    while run == True:
+#Draw the level ID indicator in the menu bar, returning the area of the screen that has changed.
+def drawLevelID(levelCounter, screen, font):
 
-        #Update to show changes 
-        pg.display.update()
-        pg.display.flip()
+    levelIDArea = pg.Rect(gridSize + 4, 2, 96, 96)
+    pg.draw.rect(screen, lightGrey, levelIDArea)
 
-        #Draw the menu bar on the right of the screen.
-        #This is done in the main loop so that previous level indicators are drawn over.
-        pg.draw.rect(screen, lightGrey, [1004, 2, 96, 96])
+    #Shrink large level numbers to fit.
+    levelID = font.render(str(levelCounter), False, white)
+    if levelID.get_width() > 80:
+        levelID = pg.transform.smoothscale(levelID, (80, max(1, levelID.get_height() * 80 // levelID.get_width())))
+    screen.blit(levelID, (gridSize + 20, 2))
 
-        #Draw the level ID indicator.
-        levelID = font.render(str(levelCounter), False, white)
-        screen.blit(levelID, (1020, 2))
+    return levelIDArea
 
-        #Checks the event stack for mouse clicks.
-        for event in pg.event.get():
+#Give each empty voxel in a mask a new module, numbered on from the largest ID in the structure so that IDs stay unique.
+#With a module type the smallest unused IDs with that type's colour are taken instead, the type itself and then every
+#sixth ID after it (see mrt.getColourOfModule), so one module of each type keeps the type as its ID whatever order they are added in.
+#The array is returned, as it is replaced by one with a larger integer type if the new IDs need it.
+def addModules(array, mask, moduleType=None):
 
-            #If click is detected.
-            if event.type == pg.MOUSEBUTTONUP:
-                pos = pg.mouse.get_pos()
+    mask = mask & (array == 0)
+    noOfModules = int(np.count_nonzero(mask))
 
-                #Get the location of the click.
-                y = math.floor(pos[1]/100)
-                x = math.floor(pos[0]/100)
+    if moduleType == None:
+        firstID = int(np.max(array)) + 1 if np.size(array) > 0 else 1
+        newIDs = np.arange(firstID, firstID + noOfModules)
+    else:
+        #Count how many steps of six each used ID with the type's colour is from the type, and fill the first free steps.
+        offsets = array[array != 0].astype(np.int64) - int(moduleType)
+        usedSteps = offsets[(offsets >= 0) & (offsets % len(mrt.colours) == 0)] // len(mrt.colours)
+        freeSteps = np.setdiff1d(np.arange(len(usedSteps) + noOfModules), usedSteps)[:noOfModules]
+        newIDs = int(moduleType) + freeSteps * len(mrt.colours)
 
-                #If the click is in the structure display area. 
-                if x < 10:
-                    voxelState = array[int(levelCounter), y, x]
+    idType = mrt.getIDType(int(newIDs[-1]) if noOfModules > 0 else 0)
+    if np.dtype(idType).itemsize > array.dtype.itemsize:
+        array = array.astype(idType)
 
-                    #If drawing a module, get the colour, draw the module and edit the array.
-                    if voxelState == 0:
-                        array[int(levelCounter), y, x] = moduleType
-                        x=x*100
-                        y=y*100
-                        pg.draw.rect(screen, mrt.getColourOfModule(moduleType), [x+2, y+2, 98, 98])
+    array[mask] = newIDs
+    return array
 
-                    #If a module exists there already, get rid of it.
-                    elif voxelState != 0:
-                        array[int(levelCounter), y, x] = 0
-                        x=x*100
-                        y=y*100
-                        pg.draw.rect(screen, dark, [x+2, y+2, 98, 98])
+#Get the slices of the box between two corners, each a (level, row, column) tuple, including both corners.
+def getBox(corner, otherCorner):
+    return tuple(slice(min(a, b), max(a, b) + 1) for a, b in zip(corner, otherCorner))
 
-                    break
+#Fill the box between two corners with new modules, leaving any modules already in it.
+def fillBox(array, corner, otherCorner):
 
-                #If the click is in the menu bar respond accordingly.
-                elif x == 10:
+    mask = np.zeros(np.shape(array), dtype=bool)
+    mask[getBox(corner, otherCorner)] = True
+    return addModules(array, mask)
 
-                    #If user clicks increase level counter.
-                    if y == 1:
+#Remove every module in the box between two corners.
+def clearBox(array, corner, otherCorner):
 
-                        #Overshoot protection.
-                        if levelCounter < 9:
+    array[getBox(corner, otherCorner)] = 0
+    return array
 
-                            #Increase level by one.
-                            levelCounter += 1
-                            createScreen(screen, font)
-                            drawLevel(array, levelCounter, screen)
+#Replace a level with the modules of a copied level, as new modules.
+def pasteLevel(array, levelCounter, copiedLevel):
+
+    array[levelCounter] = 0
+    mask = np.zeros(np.shape(array), dtype=bool)
+    mask[levelCounter] = copiedLevel
+    return addModules(array, mask)
+
+#Add new modules to the level above wherever there are modules in this level.
+def extrudeLevel(array, levelCounter):
+
+    if levelCounter + 1 >= np.shape(array)[0]:
+        return array
+
+    mask = np.zeros(np.shape(array), dtype=bool)
+    mask[levelCounter + 1] = array[levelCounter] != 0
+    return addModules(array, mask)
+
+#Load a structure to edit from a file, in any format mrt.loadStructure reads.
+#Structures are edited a level at a time, so the array is stored with the levels first.
+def loadStructure(fileName):
+
+    structure = mrt.getDenseStructure(mrt.loadStructure(fileName))
+    return np.ascontiguousarray(np.transpose(structure, (2, 0, 1)))
+
+#Ask for a file name with a Tk dialog, as the maker is run from the Tk GUI. None if no file is chosen.
+def askFileName(save=False):
+
+    from tkinter import filedialog
+    fileTypes = [('Structures', '*.txt *.npy *.npz'), ('All files', '*')]
+    if save == True:
+        fileName = filedialog.asksaveasfilename(filetypes=fileTypes)
+    else:
+        fileName = filedialog.askopenfilename(filetypes=fileTypes)
+
+    if fileName == '' or fileName == ():
+        return None
+    return fileName
+
+#Contains the main loop which runs while a structure is being edited.
+#The loop sleeps until there is an event, and only the parts of the screen that change are sent to the display.
+#Mouse:
+#   Left click adds a new module with the colour of the selected type, or removes a module.
+#   Shift and left click on two voxels fills the box between them with new modules, on any levels.
+#   Ctrl and left click on two voxels removes every module in the box between them.
+#   The wheel zooms and dragging with the right button pans.
+#Keys:
+#   Arrows pan, + and - zoom, Page Up and Page Down change level.
+#   C copies the level, V pastes it and E extrudes the level into the one above.
+#   O opens a structure file and S saves the structure to one.
+#Every module added is given its own ID, so the structure can be planned.
+def makerLoop(screen, levelCounter, array, font):
 
-                    #If user clicks decrease level counter.     
-                    elif y == 2:
+    #Set an initial module type, the colour of the modules put down when the user clicks.
+    moduleType = 1
 
-                        #Undershoot protection.
-                        if levelCounter > 0:
+    view = EditorView(np.shape(array))
+    boxCorner = None
+    copiedLevel = None
+    panRemainder = [0, 0]
 
-                            #Decrease Level counter by one.
-                            levelCounter -= 1
-                            createScreen(screen, font)
-                            drawLevel(array, levelCounter, screen)
+    #Draw the first level and its indicator.
+    pg.display.update([drawLevel(array, levelCounter, screen, view), drawLevelID(levelCounter, screen, font)])
 
-                    #If user wants to quit.
-                    elif y == 3:
-                        array = np.transpose(array, (1, 2, 0))
-                        run = False
+    #MAIN LOOP
+    run = True
+    while run == True:
 
-                    #If user selects a module type, choose that module.
-                    elif y > 3:
-                        moduleType = y-3
+        #Wait for the next event, using no CPU while the user is idle.
+        event = pg.event.wait()
+
+        #Areas of the screen changed by this event, and whether the whole level needs to be redrawn.
+        dirtyRects = []
+        redrawLevel = False
+        newLevel = levelCounter
+
+        #If click is detected.
+        if event.type == pg.MOUSEBUTTONUP and event.button == 1:
+            pos = event.pos
+            cell = view.getCell(pos)
+            modifiers = pg.key.get_mods()
+
+            #If the click is on a voxel and a box is being made, use it as a corner.
+            if cell != None and modifiers & (pg.KMOD_SHIFT | pg.KMOD_CTRL):
+                corner = (levelCounter,) + cell
+                if boxCorner == None:
+                    boxCorner = corner
+                    dirtyRects.append(pg.draw.rect(screen, white, view.getRect(*cell), 2))
+                else:
+                    if modifiers & pg.KMOD_SHIFT:
+                        array = fillBox(array, boxCorner, corner)
+                    else:
+                        array = clearBox(array, boxCorner, corner)
+                    boxCorner = None
+                    redrawLevel = True
+
+            #If the click is in the structure display area.
+            elif cell != None:
+                y, x = cell
+                voxelState = array[int(levelCounter), y, x]
+
+                #If drawing a module, add it with a new ID, get the colour and draw the module.
+                if voxelState == 0:
+                    mask = np.zeros(np.shape(array), dtype=bool)
+                    mask[int(levelCounter), y, x] = True
+                    array = addModules(array, mask, moduleType)
+                    colour = mrt.getColourOfModule(array[int(levelCounter), y, x])
+
+                #If a module exists there already, get rid of it.
+                else:
+                    array[int(levelCounter), y, x] = 0
+                    colour = dark
+
+                dirtyRects.append(pg.draw.rect(screen, colour, view.getRect(y, x)))
+
+            #If the click is in the menu bar respond accordingly.
+            elif pos[0] >= gridSize:
+                y = math.floor(pos[1]/100)
 
-            #Detect if user clicks the cross on the window.
-            elif event.type == pg.QUIT:
-                run = False
+                #If user clicks increase or decrease level counter.
+                if y == 1:
+                    newLevel = levelCounter + 1
+                elif y == 2:
+                    newLevel = levelCounter - 1
+
+                #If user wants to quit.
+                elif y == 3:
+                    run = False
+
+                #If user selects a module type, choose that module.
+                elif y > 3:
+                    moduleType = y-3
+
+        #Zoom in or out around the mouse.
+        elif event.type == pg.MOUSEWHEEL:
+            redrawLevel = view.zoom(2 ** event.y, pg.mouse.get_pos())
+
+        #Pan while the right button is held, a whole voxel at a time.
+        elif event.type == pg.MOUSEMOTION and event.buttons[2]:
+            panRemainder[0] += event.rel[1]
+            panRemainder[1] += event.rel[0]
+            rows = int(panRemainder[0] / view.cellSize)
+            columns = int(panRemainder[1] / view.cellSize)
+            panRemainder[0] -= rows * view.cellSize
+            panRemainder[1] -= columns * view.cellSize
+            redrawLevel = view.pan(-rows, -columns)
+
+        elif event.type == pg.KEYDOWN:
+
+            #Pan and zoom.
+            if event.key in (pg.K_UP, pg.K_DOWN, pg.K_LEFT, pg.K_RIGHT):
+                step = max(1, math.floor(gridSize / view.cellSize) // 4)
+                rows = {pg.K_UP: -step, pg.K_DOWN: step}.get(event.key, 0)
+                columns = {pg.K_LEFT: -step, pg.K_RIGHT: step}.get(event.key, 0)
+                redrawLevel = view.pan(rows, columns)
+            elif event.key in (pg.K_PLUS, pg.K_EQUALS, pg.K_KP_PLUS):
+                redrawLevel = view.zoom(2, (gridSize // 2, gridSize // 2))
+            elif event.key in (pg.K_MINUS, pg.K_KP_MINUS):
+                redrawLevel = view.zoom(0.5, (gridSize // 2, gridSize // 2))
+
+            #Change level.
+            elif event.key == pg.K_PAGEUP:
+                newLevel = levelCounter + 1
+            elif event.key == pg.K_PAGEDOWN:
+                newLevel = levelCounter - 1
+
+            #Bulk editing.
+            elif event.key == pg.K_c:
+                copiedLevel = array[levelCounter] != 0
+            elif event.key == pg.K_v and copiedLevel is not None:
+                array = pasteLevel(array, levelCounter, copiedLevel)
+                redrawLevel = True
+            elif event.key == pg.K_e:
+                array = extrudeLevel(array, levelCounter)
+                newLevel = levelCounter + 1
+
+            #Open and save structure files.
+            elif event.key == pg.K_o:
+                fileName = askFileName()
+                if fileName != None:
+                    array = loadStructure(fileName)
+                    view = EditorView(np.shape(array))
+                    levelCounter = 0
+                    boxCorner = None
+                    redrawLevel = True
+                    dirtyRects.append(drawLevelID(levelCounter, screen, font))
+            elif event.key == pg.K_s:
+                fileName = askFileName(save=True)
+                if fileName != None:
+                    mrt.saveStructure(fileName, np.transpose(array, (1, 2, 0)))
+
+            #Drop a box that has been started.
+            elif event.key == pg.K_ESCAPE and boxCorner != None:
+                boxCorner = None
+                redrawLevel = True
+
+        #Redraw everything if the window has been uncovered.
+        elif event.type == pg.VIDEOEXPOSE:
+            pg.display.flip()
+
+        #Detect if user clicks the cross on the window.
+        elif event.type == pg.QUIT:
+            run = False
+
+        #Overshoot and undershoot protection when changing level.
+        if newLevel != levelCounter and 0 <= newLevel < np.shape(array)[0]:
+            levelCounter = newLevel
+            redrawLevel = True
+            dirtyRects.append(drawLevelID(levelCounter, screen, font))
+
+        if redrawLevel == True:
+            dirtyRects.append(drawLevel(array, levelCounter, screen, view))
+
+            #Keep the first corner of a box marked.
+            if boxCorner != None and boxCorner[0] == levelCounter and view.isVisible(*boxCorner[1:]):
+                pg.draw.rect(screen, white, view.getRect(*boxCorner[1:]), 2)
+
+        #Update only the areas that have changed.
+        if len(dirtyRects) > 0:
+            pg.display.update(dirtyRects)
+
+    #Return the structure with the levels last, as it is used by the rest of the program.
+    array = np.transpose(array, (1, 2, 0))
 
     #print(array[0])
     pg.quit()
     return array
 
 #Run to start the program.
-def main():
+#The structure is a cube of widthOfLattice voxels, or is loaded from a file if one is given.
+def main(widthOfLattice=10, fileName=None):
 
     #Set some colours up.
     #Globally within this program.
@@ -196,22 +473,30 @@ def main():
     global white
     white = (225,225,225)
 
+    #Colour of each module ID as RGB, see mrt.colours, index 0 is the colour of empty voxels.
+    global palette
+    palette = np.array([dark] + [tuple(pg.Color(mrt.colours[i]))[:3] for i in sorted(mrt.colours)], dtype=np.uint8)
+
     #Start pygame and the font engine.
     pg.init()
     pg.font.init()
-    
+
     #Set the screen size + title.
-    #The array editing screen size is 1000x1000 to make representing a 10x10 array easier.
-    screen = pg.display.set_mode((1100, 1000))
+    #The array editing area is 1000x1000, any size of lattice is zoomed to fit it.
+    screen = pg.display.set_mode((gridSize + menuWidth, gridSize))
     pg.display.set_caption('Structure Maker - ')
 
     #Set the font, level counter and array to store the structure up.
     font = pg.font.SysFont("monospace", 90)
     levelCounter = 0
-    array = np.zeros((10,10,10))
-
-    #Create the screen, 
-    screen = createScreen(screen, font)
+    if fileName != None:
+        array = loadStructure(fileName)
+    else:
+        array = np.zeros((widthOfLattice, widthOfLattice, widthOfLattice), dtype=mrt.getIDType(widthOfLattice**3))
+
+    #Create the screen,
+    background = createBackground(font)
+    screen = createScreen(screen, background)
     array = makerLoop(screen, levelCounter, array, font)
 
     #Return the array to the GUI
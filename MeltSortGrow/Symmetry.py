@@ -0,0 +1,134 @@
+#Symmetries of the lattice, so structures that are rotations, reflections or translations of each other can share work.
+#A structure is mapped to a canonical form, chosen the same way from every one of its 48 orientations and any offset,
+#and melts or plans made for one structure can be mapped back onto any other with the same canonical form.
+
+#Import dependencies.
+import itertools
+import numpy as np
+import ModularRoboticsToolkit as mrt
+import PlanCache as pc
+
+#Every way of reordering the three axes, combined with every way of reversing them, gives the 48 cube symmetries.
+permutations = list(itertools.permutations(range(3)))
+signCombinations = list(itertools.product((1, -1), repeat=3))
+
+#A map from a lattice into canonical space, reordering and reversing the axes and then moving the structure.
+#Canonical coordinates are found as canonical[i] = signs[i] * original[permutation[i]] + offset[i].
+#Shape is the shape of the original lattice, anything mapped back outside of it is rejected.
+class Transform():
+
+    def __init__(self, permutation, signs, offset, shape):
+
+        self.permutation = np.array(permutation)
+        self.signs = np.array(signs, dtype=np.int64)
+        self.offset = np.array(offset, dtype=np.int64)
+        self.shape = tuple(int(i) for i in shape)
+
+    #Map an N by 3 array of coordinates into canonical space.
+    def apply(self, coordinates):
+        return np.asarray(coordinates, dtype=np.int64)[:, self.permutation] * self.signs + self.offset
+
+    #Map an N by 3 array of canonical coordinates back into the lattice.
+    def invert(self, coordinates):
+
+        original = np.empty((len(coordinates), 3), dtype=np.int64)
+        original[:, self.permutation] = (np.asarray(coordinates, dtype=np.int64) - self.offset) * self.signs
+        return original
+
+    #Are all of an N by 3 array of coordinates inside the original lattice.
+    def isInLattice(self, coordinates):
+        return bool(np.all((coordinates >= 0) & (coordinates < np.array(self.shape))))
+
+    #Map the locations in a log array into canonical space, leaving hold locations as they are.
+    def applyToLog(self, array):
+        return self.mapLog(array, self.apply)
+
+    #Map the locations in a canonical log array back into the lattice, None if any of them are outside of it.
+    def invertLog(self, array):
+
+        array = self.mapLog(array, self.invert)
+        for first, last, hold in ((mrt.OLD_Z, mrt.OLD_Y, mrt.OLD_HOLD), (mrt.NEW_Z, mrt.NEW_Y, mrt.NEW_HOLD)):
+            if not self.isInLattice(array[first:last+1, array[hold] == 0].T):
+                return None
+
+        return array
+
+    #Map the old and new locations of every movement that is not to or from the hold.
+    def mapLog(self, array, mapping):
+
+        array = np.array(array, dtype=mrt.logType)
+        for first, last, hold in ((mrt.OLD_Z, mrt.OLD_Y, mrt.OLD_HOLD), (mrt.NEW_Z, mrt.NEW_Y, mrt.NEW_HOLD)):
+            inLattice = array[hold] == 0
+            array[first:last+1, inLattice] = mapping(array[first:last+1, inLattice].T).T
+
+        return array
+
+    #Map melt coordinates into canonical space, as integers with -1 representing the line along which to melt.
+    def applyToMeltCoordinates(self, meltCoordinates):
+
+        coordinates = np.array([0 if i == 'm' else int(i) for i in meltCoordinates.getTuple()], dtype=np.int64)
+        canonical = self.apply(coordinates[np.newaxis])[0]
+        canonical[self.permutation == list(meltCoordinates.getTuple()).index('m')] = -1
+
+        return canonical
+
+    #Map canonical melt coordinates back into the lattice, None if the line is outside of it.
+    def invertMeltCoordinates(self, canonical):
+
+        canonical = np.array(canonical, dtype=np.int64)
+        meltAxis = self.permutation[canonical == -1][0]
+        canonical[canonical == -1] = self.offset[canonical == -1]
+        coordinates = self.invert(canonical[np.newaxis])[0]
+        coordinates[meltAxis] = 0
+
+        if not self.isInLattice(coordinates[np.newaxis]):
+            return None
+
+        meltCoordinates = [int(i) for i in coordinates]
+        meltCoordinates[meltAxis] = 'm'
+        return mrt.Location(*meltCoordinates)
+
+    #Map canonical coordinates and module IDs back into a sparse structure in the lattice, None if any are outside of it.
+    def invertStructure(self, coordinates, moduleIDs):
+
+        coordinates = self.invert(coordinates)
+        if not self.isInLattice(coordinates):
+            return None
+
+        return mrt.SparseStructure(self.shape, coordinates, moduleIDs)
+
+#Find the canonical form of one or more structures in the same lattice, moved together as a single structure.
+#Returns the transform into canonical space and the key of each structure once it is there.
+def getCanonicalForm(structures):
+
+    shape = structures[0].shape
+    sparseStructures = [mrt.getSparseStructure(structure).getCoordinates() for structure in structures]
+    allCoordinates = np.concatenate([coordinates for coordinates, moduleIDs in sparseStructures])
+
+    #The canonical shape does not depend on the order of the axes.
+    canonicalShape = tuple(sorted(shape))
+
+    bestTransform = None
+    bestKeys = None
+    for permutation in permutations:
+        for signs in signCombinations:
+
+            #Move the corner of the box around the structures to the origin.
+            offset = np.zeros(3, dtype=np.int64)
+            if len(allCoordinates) > 0:
+                offset = -np.min(allCoordinates[:, permutation] * np.array(signs), axis=0)
+            transform = Transform(permutation, signs, offset, shape)
+
+            keys = []
+            for coordinates, moduleIDs in sparseStructures:
+                coordinates = transform.apply(coordinates)
+                order = np.lexsort((coordinates[:, 2], coordinates[:, 1], coordinates[:, 0]))
+                #Canonical keys are kept apart from the keys of structures as they are, whose entries are not mapped.
+                keys.append('canonical ' + pc.getCoordinatesKey(canonicalShape, coordinates[order], moduleIDs[order]))
+
+            #Every orientation of a structure has the same 48 forms, so taking the smallest keys picks the same form from any of them.
+            if bestKeys == None or keys < bestKeys:
+                bestTransform = transform
+                bestKeys = keys
+
+    return bestTransform, bestKeys
@@ -0,0 +1,8 @@
+#Shared setup for the tests.
+#The modules of the planner import each other by name from the MeltSortGrow folder, so it is put on the path as running a script there would.
+
+#Import dependencies.
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'MeltSortGrow'))
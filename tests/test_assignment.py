@@ -0,0 +1,54 @@
+#Tests of the assignment solver used by the optimal allign mode, against trying every assignment.
+#Random cost matrices are solved both ways, so a change to the solver that stops it finding the cheapest assignment is caught.
+
+#Import dependencies.
+import itertools
+import numpy as np
+import pytest
+import MeltSortGrow as msg
+import PlanValidator as pv
+import StructGen as sg
+
+#Find the cheapest total cost of giving every row a different column, by trying every assignment.
+def getBruteForceCost(costs):
+
+    noOfRows, noOfColumns = costs.shape
+    rows = np.arange(noOfRows)
+    return min(costs[rows, list(columns)].sum() for columns in itertools.permutations(range(noOfColumns), noOfRows))
+
+#Make a random cost matrix with at least as many columns as rows.
+#Half are distances between random points, as the allign phase uses, and half are small integers so there are many ties.
+def getRandomCosts(rng, largestSize):
+
+    noOfRows = int(rng.integers(1, largestSize + 1))
+    noOfColumns = int(rng.integers(noOfRows, largestSize + 2))
+
+    if rng.integers(2) == 0:
+        modules = rng.integers(0, 10, (noOfRows, 3))
+        spaces = rng.integers(0, 10, (noOfColumns, 3))
+        return np.linalg.norm(modules[:, np.newaxis, :] - spaces[np.newaxis, :, :], axis=2)
+
+    return rng.integers(0, 4, (noOfRows, noOfColumns)).astype(np.float64)
+
+#Every row is given its own column, at the cheapest total cost.
+@pytest.mark.parametrize('seed', range(4))
+def testCheapestAssignment(seed):
+
+    rng = np.random.default_rng(seed)
+    for matrixNo in range(50):
+        costs = getRandomCosts(rng, 5)
+        assignment = msg.solveAssignment(costs)
+
+        assert len(assignment) == costs.shape[0]
+        assert len(set(assignment.tolist())) == len(assignment)
+        assert np.isclose(costs[np.arange(costs.shape[0]), assignment].sum(), getBruteForceCost(costs))
+
+#Plans made with the optimal allign mode are valid.
+@pytest.mark.parametrize('kind', list(sg.kinds))
+def testOptimalAllignPlansAreValid(kind):
+
+    initialStructure, goalStructure = sg.generatePair(kind, 8, 8, seed=1)
+    meltSuccsessful, movements = msg.main(initialStructure, goalStructure, allignMode='optimal')
+
+    result = pv.validatePlan(initialStructure, goalStructure, movements)
+    assert result.valid, result.message
@@ -0,0 +1,48 @@
+#Tests of the melt, which must put every module into one line without losing any of them.
+
+#Import dependencies.
+import numpy as np
+import pytest
+import MeltSortGrow as msg
+import PlanValidator as pv
+import StructGen as sg
+
+#Count the modules on the line a melt finished on, which must be all of them.
+def getModulesInMeltLine(structure, meltCoordinates):
+    return int(np.count_nonzero(msg.getMeltLine(structure, meltCoordinates)))
+
+#With both ends of the melt line outside the lattice, modules must be melted into its gaps rather than past its ends.
+def testMeltLineFullWidth():
+
+    structure = np.zeros((6, 7, 6), dtype=np.uint16)
+    for moduleID, location in zip([2, 5, 6, 4, 1, 3], [(0, 2, 1), (0, 2, 5), (0, 6, 0), (3, 1, 4), (4, 2, 5), (4, 6, 1)]):
+        structure[location] = moduleID
+
+    meltCoordinates, meltedStructure, movements = msg.meltStructure(np.copy(structure))
+
+    assert sorted(meltedStructure[meltedStructure != 0].tolist()) == [1, 2, 3, 4, 5, 6]
+    assert getModulesInMeltLine(meltedStructure, meltCoordinates) == 6
+    assert pv.validatePlan(structure, meltedStructure, movements).valid
+
+#Scattered modules nearly as many as the width of the lattice always melt into one line.
+@pytest.mark.parametrize('seed', range(5))
+def testMeltScatteredModules(seed):
+
+    rng = np.random.default_rng(seed)
+    for structureNo in range(20):
+        shape = tuple(int(i) for i in rng.integers(3, 8, 3))
+        noOfModules = int(rng.integers(2, min(shape) + 1))
+        structure = np.zeros(shape, dtype=np.uint16)
+        structure.flat[rng.choice(structure.size, noOfModules, replace=False)] = rng.permutation(noOfModules) + 1
+
+        meltCoordinates, meltedStructure, movements = msg.meltStructure(np.copy(structure))
+
+        assert getModulesInMeltLine(meltedStructure, meltCoordinates) == noOfModules
+        assert pv.validatePlan(structure, meltedStructure, movements).valid
+
+#A line the full width of the lattice cannot take more modules than it has spaces.
+def testMeltTooManyModules():
+
+    structure = sg.generateStructure('blob', 5, 4, seed=0)
+    with pytest.raises(ValueError):
+        msg.meltStructure(structure)
@@ -0,0 +1,53 @@
+#Tests of the checks made on every movement as it is stored, for dense and sparse structures.
+
+#Import dependencies.
+import numpy as np
+import pytest
+import ModularRoboticsToolkit as mrt
+
+#A 4x4x4 lattice with modules 1 and 2 in it, as a dense array or a sparse structure.
+@pytest.fixture(params=['dense', 'sparse'])
+def structure(request):
+
+    structure = np.zeros((4, 4, 4), dtype=np.uint16)
+    structure[0, 0, 0] = 1
+    structure[0, 0, 1] = 2
+    if request.param == 'sparse':
+        return mrt.getSparseStructure(structure)
+    return structure
+
+#Movements into and out of the hold and around the lattice are stored in order.
+def testMovementsAreStored(structure):
+
+    movements = mrt.Movements(structure)
+    movements.storeMovement(1, (0, 0, 0), None)
+    movements.storeMovement(2, (0, 0, 1), (3, 3, 3))
+    movements.storeMovement(1, None, (0, 0, 1))
+
+    assert movements.legnth() == 3
+    assert list(movements.getMovements().getTuples()) == [(1, (0, 0, 0), None), (2, (0, 0, 1), (3, 3, 3)), (1, None, (0, 0, 1))]
+
+#Movements from the wrong place, into an occupied voxel or out of the lattice are not stored.
+@pytest.mark.parametrize('moduleID, oldLocation, newLocation', [
+    (1, (0, 0, 1), (1, 0, 0)),
+    (1, None, (1, 0, 0)),
+    (1, (0, 0, 0), (0, 0, 1)),
+    (1, (0, 0, 0), (0, 0, -1)),
+    (1, (0, 0, 0), (4, 0, 0)),
+    (1, (0, 0, -4), (1, 0, 0)),
+    (2**31, (0, 0, 0), (1, 0, 0))])
+def testBadMovementsRaise(structure, moduleID, oldLocation, newLocation):
+
+    movements = mrt.Movements(structure)
+    with pytest.raises(ValueError):
+        movements.storeMovement(moduleID, oldLocation, newLocation)
+    assert movements.legnth() == 0
+
+#IDs are stored in the smallest type that holds them, up to the largest ID the movement log can hold.
+def testIDType():
+
+    assert mrt.getIDType(1) == np.uint16
+    assert mrt.getIDType(2**16) == np.uint32
+    assert mrt.getIDType(np.iinfo(mrt.logType).max) == np.uint32
+    with pytest.raises(ValueError):
+        mrt.getIDType(np.iinfo(mrt.logType).max + 1)
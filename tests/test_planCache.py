@@ -0,0 +1,89 @@
+#Tests of the plan cache, whose plans and melts must give the same movements as planning from scratch.
+
+#Import dependencies.
+import os
+import numpy as np
+import ModularRoboticsToolkit as mrt
+import MeltSortGrow as msg
+import PlanCache as pc
+import PlanValidator as pv
+import StructGen as sg
+
+#Get the log array of a plan, to compare plans by.
+def getArray(movements):
+    return np.array(movements.getMovements().getArray())
+
+#Planning the same pair again is a cache hit, with the same movements as planning without the cache.
+def testCachedPlanMatchesUncached():
+
+    initialStructure, goalStructure = sg.generatePair('walk', 8, 8, seed=0)
+    meltSuccsessful, expected = msg.main(initialStructure, goalStructure)
+    planCache = pc.PlanCache()
+
+    meltSuccsessful, firstPlan = msg.main(initialStructure, goalStructure, planCache=planCache)
+    hits = planCache.hits
+    meltSuccsessful, secondPlan = msg.main(initialStructure, goalStructure, planCache=planCache)
+
+    assert planCache.hits > hits
+    assert np.array_equal(getArray(firstPlan), getArray(expected))
+    assert np.array_equal(getArray(secondPlan), getArray(expected))
+
+#Changing a cached plan does not change what the cache gives next time.
+def testCachedPlansAreCopied():
+
+    initialStructure, goalStructure = sg.generatePair('blob', 8, 8, seed=1)
+    planCache = pc.PlanCache()
+    meltSuccsessful, firstPlan = msg.main(initialStructure, goalStructure, planCache=planCache)
+    expected = getArray(firstPlan)
+
+    firstPlan.flip()
+    meltSuccsessful, secondPlan = msg.main(initialStructure, goalStructure, planCache=planCache)
+    assert np.array_equal(getArray(secondPlan), expected)
+
+#A new pair sharing a structure with a cached pair reuses its melt, and still makes a valid plan.
+def testCachedMeltIsReused():
+
+    initialStructure, goalStructure = sg.generatePair('walk', 8, 8, seed=2)
+    otherGoal = sg.generateStructure('blob', 8, 8, seed=3)
+    planCache = pc.PlanCache()
+    msg.main(initialStructure, goalStructure, planCache=planCache)
+
+    hits = planCache.hits
+    meltSuccsessful, movements = msg.main(initialStructure, otherGoal, planCache=planCache)
+
+    assert planCache.hits > hits
+    assert pv.validatePlan(initialStructure, otherGoal, movements).valid
+
+#Entries written to a folder are found by a new cache using it, for dense and sparse structures alike.
+def testCacheOnDisk(tmp_path):
+
+    initialStructure, goalStructure = sg.generatePair('tower', 8, 8, seed=4)
+    meltSuccsessful, expected = msg.main(initialStructure, goalStructure, planCache=pc.PlanCache(str(tmp_path)))
+    assert len(os.listdir(tmp_path)) > 0
+
+    planCache = pc.PlanCache(str(tmp_path))
+    meltSuccsessful, movements = msg.main(mrt.getSparseStructure(initialStructure), mrt.getSparseStructure(goalStructure), planCache=planCache)
+
+    assert planCache.hits > 0
+    assert np.array_equal(getArray(movements), getArray(expected))
+
+#Structures with the same modules in the same places have the same key, however they are stored.
+def testStructureKeys():
+
+    structure = sg.generateStructure('shell', 8, 8, seed=5)
+    key = pc.getStructureKey(structure)
+
+    assert pc.getStructureKey(structure.astype(np.uint32)) == key
+    assert pc.getStructureKey(mrt.getSparseStructure(structure)) == key
+    assert pc.getStructureKey(sg.generateStructure('shell', 8, 8, seed=6)) != key
+
+#The least recently used entries are removed when there are too many, from memory and disk.
+def testCacheEviction(tmp_path):
+
+    planCache = pc.PlanCache(str(tmp_path), maxEntries=3)
+    for pairNo in range(4):
+        initialStructure, goalStructure = sg.generatePair('walk', 6, 8, seed=(7, pairNo))
+        msg.main(initialStructure, goalStructure, planCache=planCache)
+
+    assert len(planCache) == 3
+    assert len(os.listdir(tmp_path)) <= 3
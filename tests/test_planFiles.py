@@ -0,0 +1,87 @@
+#Tests of saving and loading plans, as text and as binary plans with and without compression.
+
+#Import dependencies.
+import numpy as np
+import pytest
+import ModularRoboticsToolkit as mrt
+import MeltSortGrow as msg
+import PlanValidator as pv
+import StructGen as sg
+
+#Make a plan between a pair of random structures.
+def makePlan(seed=0):
+
+    initialStructure, goalStructure = sg.generatePair('walk', 8, 8, seed=seed)
+    meltSuccsessful, movements = msg.main(initialStructure, goalStructure)
+    return initialStructure, goalStructure, movements
+
+#Plans load with the same movements they were saved with, and are still valid.
+@pytest.mark.parametrize('fileName, compress', [('plan.txt', False), ('plan.plan', False), ('plan.plan', True)])
+def testPlanRoundTrip(tmp_path, fileName, compress):
+
+    initialStructure, goalStructure, movements = makePlan()
+    filePath = str(tmp_path / fileName)
+    mrt.savePlan(filePath, movements, initialStructure, compress)
+    loadedMovements = mrt.loadPlan(filePath)
+
+    assert np.array_equal(loadedMovements.getMovements().getArray(), movements.getMovements().getArray())
+    assert pv.validatePlan(initialStructure, goalStructure, loadedMovements).valid
+
+#The header of a binary plan records its lattice, modules and steps, and whether it is compressed.
+def testPlanHeader(tmp_path):
+
+    initialStructure, goalStructure, movements = makePlan()
+    mrt.savePlan(str(tmp_path / 'plan.plan'), movements, initialStructure)
+    mrt.savePlan(str(tmp_path / 'compressed.plan'), movements, initialStructure, compress=True)
+
+    header = mrt.readPlanHeader(str(tmp_path / 'plan.plan'))
+    assert header['shape'] == (8, 8, 8)
+    assert header['noOfModules'] == 8
+    assert header['noOfSteps'] == movements.legnth()
+    assert header['flags'] & mrt.planCompressed == 0
+    assert mrt.readPlanHeader(str(tmp_path / 'compressed.plan'))['flags'] & mrt.planCompressed
+
+#Without a structure the lattice in the header is the smallest that holds every movement.
+def testPlanHeaderWithoutStructure(tmp_path):
+
+    initialStructure, goalStructure, movements = makePlan()
+    mrt.savePlan(str(tmp_path / 'plan.plan'), movements)
+
+    largest = np.max(movements.getMovements().getArray()[mrt.OLD_Z:mrt.NEW_Y+1], axis=1)
+    shape = mrt.readPlanHeader(str(tmp_path / 'plan.plan'))['shape']
+    assert all(shape[axis] > max(largest[axis], largest[axis+3]) for axis in range(3))
+
+#Empty plans can be saved and loaded, NumPy warns that an empty text plan has no data in it.
+@pytest.mark.filterwarnings('ignore:loadtxt')
+@pytest.mark.parametrize('fileName', ['plan.txt', 'plan.plan'])
+def testEmptyPlan(tmp_path, fileName):
+
+    mrt.savePlan(str(tmp_path / fileName), mrt.Movements())
+    assert mrt.loadPlan(str(tmp_path / fileName)).legnth() == 0
+
+#Memory mapped plans can be changed without changing the file.
+def testMemoryMappedPlanIsCopyOnWrite(tmp_path):
+
+    initialStructure, goalStructure, movements = makePlan()
+    filePath = str(tmp_path / 'plan.plan')
+    mrt.savePlan(filePath, movements, initialStructure)
+
+    loadedMovements = mrt.loadPlanBinary(filePath)
+    loadedMovements.flip()
+    loadedMovements.combine(movements)
+
+    assert np.array_equal(mrt.loadPlan(filePath).getMovements().getArray(), movements.getMovements().getArray())
+
+#Files which are not binary plans, or are cut short, are not loaded.
+def testBadPlanFiles(tmp_path):
+
+    (tmp_path / 'bad.plan').write_bytes(b'hello')
+    with pytest.raises(ValueError):
+        mrt.loadPlan(str(tmp_path / 'bad.plan'))
+
+    initialStructure, goalStructure, movements = makePlan()
+    mrt.savePlan(str(tmp_path / 'plan.plan'), movements, initialStructure)
+    data = (tmp_path / 'plan.plan').read_bytes()
+    (tmp_path / 'short.plan').write_bytes(data[:-4])
+    with pytest.raises(ValueError):
+        mrt.loadPlan(str(tmp_path / 'short.plan'))
@@ -0,0 +1,52 @@
+#Tests of sparse structures, which must behave like the dense arrays they stand in for.
+
+#Import dependencies.
+import numpy as np
+import pytest
+import ModularRoboticsToolkit as mrt
+import MeltSortGrow as msg
+import PlanValidator as pv
+import StructGen as sg
+
+#Single voxels and lines read the same as from the dense array, writes change both the same way and writes outside the lattice raise.
+def testSparseIndexingMatchesDense():
+
+    dense = sg.generateStructure('walk', 10, 6, seed=0)
+    sparse = mrt.getSparseStructure(dense)
+
+    assert sparse.shape == dense.shape
+    assert np.array_equal(sparse.getDense(), dense)
+    for key in [(1, 2, 3), (0, slice(None), 4), (slice(None), 5, 0), (2, 3, slice(1, 4))]:
+        assert np.array_equal(sparse[key], dense[key])
+
+    location = tuple(int(i) for i in np.argwhere(dense)[0])
+    dense[location] = 0
+    sparse[location] = 0
+    assert np.array_equal(sparse.getDense(), dense)
+
+    with pytest.raises(IndexError):
+        sparse[6, 0, 0] = 1
+
+#Two modules with the same ID cannot be put in a sparse structure.
+def testSparseDuplicateIDsRaise():
+
+    with pytest.raises(ValueError):
+        mrt.SparseStructure((4, 4, 4), [(0, 0, 0), (1, 0, 0)], [1, 1])
+
+#Planning between sparse structures makes the same movements as between dense ones.
+@pytest.mark.parametrize('kind', list(sg.kinds))
+def testSparsePlansMatchDense(kind):
+
+    initialStructure, goalStructure = sg.generatePair(kind, 8, 8, seed=3)
+    meltSuccsessful, denseMovements = msg.main(initialStructure, goalStructure)
+    meltSuccsessful, sparseMovements = msg.main(mrt.getSparseStructure(initialStructure), mrt.getSparseStructure(goalStructure))
+
+    assert np.array_equal(denseMovements.getMovements().getArray(), sparseMovements.getMovements().getArray())
+
+#Sparse structures can be planned in lattices far too large to hold as an array.
+def testSparsePlanInLargeLattice():
+
+    initialStructure, goalStructure = sg.generatePair('walk', 12, 2000, seed=4, sparse=True)
+    meltSuccsessful, movements = msg.main(initialStructure, goalStructure)
+
+    assert pv.validatePlan(initialStructure, goalStructure, movements).valid
@@ -0,0 +1,73 @@
+#Tests of stepping through a plan, where seeking to any step must give the same structure as replaying the plan to it.
+
+#Import dependencies.
+import numpy as np
+import pytest
+import ModularRoboticsToolkit as mrt
+import MeltSortGrow as msg
+import StructGen as sg
+
+#Replay a plan from the start, returning the structure after every step, starting with the initial structure.
+def replaySteps(initialStructure, movements):
+
+    structure = np.copy(initialStructure)
+    structures = [np.copy(structure)]
+    for moduleID, oldLocation, newLocation in movements.getMovements().getTuples():
+        if oldLocation != None:
+            structure[oldLocation] = 0
+        if newLocation != None:
+            structure[newLocation] = moduleID
+        structures.append(np.copy(structure))
+
+    return structures
+
+#Seeking to random steps, in any order, gives the structure replaying reaches at that step.
+@pytest.mark.parametrize('sparse', [False, True])
+@pytest.mark.parametrize('keyframeInterval', [1, 4, 256])
+def testSeekMatchesReplay(sparse, keyframeInterval):
+
+    initialStructure, goalStructure = sg.generatePair('walk', 8, 8, seed=0)
+    meltSuccsessful, movements = msg.main(initialStructure, goalStructure)
+    structures = replaySteps(initialStructure, movements)
+    noOfSteps = movements.legnth()
+
+    structure = mrt.getSparseStructure(initialStructure) if sparse == True else initialStructure
+    stepStructure = mrt.StepStructure(structure, movements, keyframeInterval=keyframeInterval)
+
+    rng = np.random.default_rng(1)
+    for stepNo in [noOfSteps, 0, noOfSteps] + rng.integers(0, noOfSteps + 1, 100).tolist() + [0]:
+        stepStructure.seek(int(stepNo))
+        assert stepStructure.step == stepNo
+        assert np.array_equal(mrt.getDenseStructure(stepStructure.getStructure()), structures[stepNo])
+
+    assert np.array_equal(structures[-1], goalStructure)
+    assert np.array_equal(mrt.getDenseStructure(structure), initialStructure)
+
+#Stepping forward and backward one step at a time stops at either end of the plan.
+def testMoveStep():
+
+    initialStructure, goalStructure = sg.generatePair('blob', 6, 8, seed=2)
+    meltSuccsessful, movements = msg.main(initialStructure, goalStructure)
+    structures = replaySteps(initialStructure, movements)
+    stepStructure = mrt.StepStructure(initialStructure, movements, keyframeInterval=4)
+
+    for stepNo in range(1, movements.legnth() + 1):
+        assert stepStructure.moveStep('forward')[0] == True
+        assert np.array_equal(stepStructure.getStructure(), structures[stepNo])
+    assert stepStructure.moveStep('forward')[0] == False
+
+    for stepNo in reversed(range(movements.legnth())):
+        assert stepStructure.moveStep('backward')[0] == True
+        assert np.array_equal(stepStructure.getStructure(), structures[stepNo])
+    assert stepStructure.moveStep('backward')[0] == False
+
+#Steps outside the plan cannot be seeked to.
+def testSeekOutsidePlan():
+
+    initialStructure, goalStructure = sg.generatePair('walk', 6, 8, seed=3)
+    meltSuccsessful, movements = msg.main(initialStructure, goalStructure)
+    stepStructure = mrt.StepStructure(initialStructure, movements)
+
+    for stepNo in [-1, movements.legnth() + 1]:
+        with pytest.raises(IndexError):
+            stepStructure.seek(stepNo)
@@ -0,0 +1,65 @@
+#Tests of streaming plans, which must give the same movements, in order, as planning in one go.
+
+#Import dependencies.
+import threading
+import pytest
+import ModularRoboticsToolkit as mrt
+import MeltSortGrow as msg
+import PlanCache as pc
+import StructGen as sg
+
+#Take every movement from a stream, along with the movements it returns when it ends.
+def readStream(stream):
+
+    streamed = []
+    while True:
+        try:
+            streamed.append(next(stream))
+        except StopIteration as end:
+            return streamed, end.value
+
+#Streamed movements are those of MeltSortGrow.main, with or without a cache or parallel melts.
+@pytest.mark.parametrize('options', [{}, {'parallelMelt': True}, {'allignMode': 'optimal'}, {'symmetry': True}])
+def testStreamMatchesPlan(options):
+
+    initialStructure, goalStructure = sg.generatePair('blob', 8, 8, seed=0)
+    meltSuccsessful, movements = msg.main(initialStructure, goalStructure, **options)
+    expected = list(movements.getMovements().getTuples())
+
+    streamed, streamedMovements = readStream(msg.streamPlan(initialStructure, goalStructure, **options))
+    assert streamed == expected
+    assert list(streamedMovements.getMovements().getTuples()) == expected
+
+#Plans that come from the cache are streamed the same as plans made from scratch.
+def testStreamFromCache():
+
+    initialStructure, goalStructure = sg.generatePair('walk', 8, 8, seed=1)
+    meltSuccsessful, movements = msg.main(initialStructure, goalStructure)
+    planCache = pc.PlanCache()
+
+    for streamNo in range(2):
+        streamed, streamedMovements = readStream(msg.streamPlan(initialStructure, goalStructure, planCache=planCache))
+        assert streamed == list(movements.getMovements().getTuples())
+    assert planCache.hits > 0
+
+#Closing a stream early stops the planner rather than leaving it running.
+def testStreamClosedEarly():
+
+    initialStructure, goalStructure = sg.generatePair('walk', 10, 200, seed=2, sparse=True)
+    threadsBefore = threading.active_count()
+
+    stream = msg.streamPlan(initialStructure, goalStructure)
+    next(stream)
+    stream.close()
+
+    for thread in threading.enumerate():
+        if thread is not threading.current_thread():
+            thread.join(timeout=10)
+    assert threading.active_count() <= threadsBefore
+
+#Errors in planning are raised from the stream.
+def testStreamRaisesPlanningErrors():
+
+    initialStructure, goalStructure = sg.generatePair('walk', 6, 8, seed=3)
+    with pytest.raises(ValueError):
+        list(msg.streamPlan(initialStructure, goalStructure, allignMode='bad'))
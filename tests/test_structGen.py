@@ -0,0 +1,78 @@
+#Tests of the random structure generator, whose structures must be connected and made again from the same seed.
+
+#Import dependencies.
+import os
+import numpy as np
+import pytest
+import ModularRoboticsToolkit as mrt
+import StructGen as sg
+
+#Are the modules of a structure all connected to each other through their faces.
+def isConnected(structure):
+
+    cells = set(map(tuple, np.argwhere(structure).tolist()))
+    start = next(iter(cells))
+    found = {start}
+    toSearch = [start]
+    while len(toSearch) > 0:
+        for neighbour in sg.getNeighbours(toSearch.pop(), structure.shape):
+            if neighbour in cells and neighbour not in found:
+                found.add(neighbour)
+                toSearch.append(neighbour)
+
+    return len(found) == len(cells)
+
+#Every kind of structure has the number of modules asked for, with IDs from one up, all connected.
+@pytest.mark.parametrize('kind', list(sg.kinds))
+@pytest.mark.parametrize('noOfModules, widthOfLattice', [(1, 4), (8, 8), (30, 10)])
+def testStructuresAreConnected(kind, noOfModules, widthOfLattice):
+
+    for seed in range(3):
+        structure = sg.generateStructure(kind, noOfModules, widthOfLattice, seed)
+
+        assert structure.shape == (widthOfLattice, widthOfLattice, widthOfLattice)
+        assert sorted(structure[structure != 0].tolist()) == list(range(1, noOfModules + 1))
+        assert isConnected(structure)
+
+#Towers are at least two modules wide, so they are never a single line.
+def testTowersHaveAFootprint():
+
+    structure = sg.generateStructure('tower', 8, 8, seed=0)
+    assert np.count_nonzero(np.any(structure, axis=0)) >= 4
+
+#The same seed makes the same structures, dense or sparse.
+def testSeedsAreReproducible():
+
+    initialStructure, goalStructure = sg.generatePair('blob', 8, 8, seed=(1, 2))
+    assert np.array_equal(sg.generatePair('blob', 8, 8, seed=(1, 2))[0], initialStructure)
+
+    sparseInitial, sparseGoal = sg.generatePair('blob', 8, 8, seed=(1, 2), sparse=True)
+    assert np.array_equal(sparseInitial.getDense(), initialStructure)
+    assert np.array_equal(sparseGoal.getDense(), goalStructure)
+
+#Structures too large for the lattice are not generated.
+def testTooManyModules():
+
+    with pytest.raises(ValueError):
+        sg.generateStructure('blob', 28, 3, seed=0)
+    with pytest.raises(ValueError):
+        sg.generateStructure('tower', 20, 2, seed=0)
+
+#A corpus lists a job for every pair written, and the same seed writes the same pairs.
+def testCorpus(tmp_path):
+
+    jobs = sg.generateCorpus(str(tmp_path / 'first'), [(6, 5), (8, 8)], ['walk', 'shell'], pairsPerSize=2)
+    sg.generateCorpus(str(tmp_path / 'second'), [(6, 5), (8, 8)], ['walk', 'shell'], pairsPerSize=2)
+
+    assert len(jobs) == 8
+    with open(tmp_path / 'first' / 'jobs.txt') as jobList:
+        assert [line.split()[0] for line in jobList if not line.startswith('#')] == jobs
+
+    for jobID in jobs:
+        for fileName in [jobID + '-initial.npz', jobID + '-goal.npz']:
+            first = mrt.getDenseStructure(mrt.loadStructure(os.path.join(tmp_path, 'first', fileName)))
+            second = mrt.getDenseStructure(mrt.loadStructure(os.path.join(tmp_path, 'second', fileName)))
+            assert np.array_equal(first, second)
+
+    with pytest.raises(ValueError):
+        sg.generateCorpus(str(tmp_path / 'third'), [(6, 7)])
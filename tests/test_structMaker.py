@@ -0,0 +1,54 @@
+#Tests of the structure maker's editing of arrays, which must give every module added its own ID.
+
+#Import dependencies.
+import numpy as np
+import pytest
+import ModularRoboticsToolkit as mrt
+
+pytest.importorskip('pygame')
+import StructMaker as sm
+
+#Add a module of a type at a voxel, as a click does.
+def click(array, voxel, moduleType):
+
+    mask = np.zeros(np.shape(array), dtype=bool)
+    mask[voxel] = True
+    return sm.addModules(array, mask, moduleType)
+
+#Clicked modules take the smallest unused ID with their type's colour, so one of each type has the type as its ID.
+def testClickedModuleIDs():
+
+    clicks = [((0, 0, 0), 3), ((0, 0, 1), 1), ((0, 0, 2), 3), ((0, 0, 3), 6), ((0, 1, 0), 1)]
+    array = np.zeros((4, 4, 4), dtype=np.uint16)
+    for voxel, moduleType in clicks:
+        array = click(array, voxel, moduleType)
+        assert mrt.getColourOfModule(array[voxel]) == mrt.getColourOfModule(moduleType)
+    assert array[0, :2].tolist() == [[3, 1, 9, 6], [7, 0, 0, 0]]
+
+    #A removed module's ID is used again.
+    array[0, 0, 0] = 0
+    array = click(array, (1, 0, 0), 3)
+    assert array[1, 0, 0] == 3
+
+#Modules added in bulk are numbered on from the largest ID, and voxels with modules in them are left alone.
+def testBulkModuleIDs():
+
+    array = np.zeros((4, 4, 4), dtype=np.uint16)
+    array = click(array, (0, 0, 1), 2)
+    array = sm.fillBox(array, (0, 0, 0), (0, 0, 3))
+
+    assert array[0, 0].tolist() == [3, 2, 4, 5]
+    assert len(np.unique(array[array != 0])) == np.count_nonzero(array)
+
+    array = sm.clearBox(array, (0, 0, 0), (0, 0, 1))
+    assert array[0, 0].tolist() == [0, 0, 4, 5]
+
+#The array is widened when the new IDs do not fit in its integer type.
+def testArrayIsWidened():
+
+    array = np.zeros((2, 2, 2), dtype=np.uint16)
+    array[0, 0, 0] = np.iinfo(np.uint16).max
+    array = sm.fillBox(array, (1, 1, 0), (1, 1, 1))
+
+    assert array.dtype == np.uint32
+    assert array[1, 1].tolist() == [2**16, 2**16 + 1]
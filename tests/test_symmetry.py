@@ -0,0 +1,79 @@
+#Tests of symmetry aware canonical forms, which must be the same for every rotation, reflection and translation of a structure.
+
+#Import dependencies.
+import numpy as np
+import pytest
+import ModularRoboticsToolkit as mrt
+import MeltSortGrow as msg
+import PlanCache as pc
+import PlanValidator as pv
+import StructGen as sg
+import Symmetry as sym
+
+#Reorder and reverse the axes of structures in a cubic lattice, moved together so they keep their places relative to each other.
+#The structures are then moved as far along each axis as the lattice allows, to also test a translation.
+def moveTogether(structures, permutation, signs):
+
+    cells = [np.argwhere(structure) for structure in structures]
+    moduleIDs = [structure[tuple(structureCells.T)] for structure, structureCells in zip(structures, cells)]
+    cells = [structureCells[:, list(permutation)] * np.array(signs) for structureCells in cells]
+
+    allCells = np.concatenate(cells)
+    width = structures[0].shape[0]
+    offset = width - 1 - np.max(allCells, axis=0)
+
+    movedStructures = []
+    for structureCells, structureIDs in zip(cells, moduleIDs):
+        movedStructure = np.zeros_like(structures[0])
+        movedStructure[tuple((structureCells + offset).T)] = structureIDs
+        movedStructures.append(movedStructure)
+
+    return movedStructures
+
+#Every orientation of a structure has the same canonical key.
+@pytest.mark.parametrize('permutation', sym.permutations)
+def testCanonicalKeyOfEveryOrientation(permutation):
+
+    structure = sg.generateStructure('walk', 9, 8, seed=0)
+    transform, keys = sym.getCanonicalForm([structure])
+
+    for signs in sym.signCombinations:
+        movedStructure, = moveTogether([structure], permutation, signs)
+        assert sym.getCanonicalForm([movedStructure])[1] == keys
+        assert sym.getCanonicalForm([mrt.getSparseStructure(movedStructure)])[1] == keys
+
+#Different structures have different canonical keys.
+def testCanonicalKeysDiffer():
+
+    structure = sg.generateStructure('walk', 9, 8, seed=0)
+    otherStructure = sg.generateStructure('walk', 9, 8, seed=1)
+    assert sym.getCanonicalForm([structure])[1] != sym.getCanonicalForm([otherStructure])[1]
+
+#Transforms map coordinates and logs into canonical space and back again unchanged.
+def testTransformRoundTrip():
+
+    initialStructure, goalStructure = sg.generatePair('blob', 8, 8, seed=2)
+    meltSuccsessful, movements = msg.main(initialStructure, goalStructure)
+    array = np.array(movements.getMovements().getArray())
+    transform, keys = sym.getCanonicalForm([initialStructure, goalStructure])
+
+    coordinates = np.argwhere(initialStructure)
+    assert np.array_equal(transform.invert(transform.apply(coordinates)), coordinates)
+    assert np.array_equal(transform.invertLog(transform.applyToLog(array)), array)
+
+#A plan cached for one pair is reused for a rotated copy of the pair, and is valid there.
+@pytest.mark.parametrize('kind', list(sg.kinds))
+def testCachedPlanReusedForRotatedPair(kind):
+
+    initialStructure, goalStructure = sg.generatePair(kind, 7, 8, seed=3)
+    planCache = pc.PlanCache()
+    msg.main(initialStructure, goalStructure, planCache=planCache, symmetry=True)
+
+    for permutation, signs in [((1, 2, 0), (1, -1, 1)), ((0, 1, 2), (-1, -1, -1)), ((2, 0, 1), (1, 1, 1))]:
+        movedInitial, movedGoal = moveTogether([initialStructure, goalStructure], permutation, signs)
+        hits = planCache.hits
+        meltSuccsessful, movements = msg.main(movedInitial, movedGoal, planCache=planCache, symmetry=True)
+
+        assert planCache.hits > hits
+        result = pv.validatePlan(movedInitial, movedGoal, movements)
+        assert result.valid, result.message
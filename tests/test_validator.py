@@ -0,0 +1,109 @@
+#Tests of the plan validator, against replaying each plan a movement at a time.
+#Plans are made between random structures and then corrupted, and both ways of checking them must find the same
+#first movement that cannot be made, so a change to the array operations of the validator that misses a fault is caught.
+
+#Import dependencies.
+import numpy as np
+import pytest
+import ModularRoboticsToolkit as mrt
+import MeltSortGrow as msg
+import PlanValidator as pv
+import StructGen as sg
+
+#Replay a plan on a dense structure a movement at a time, returning the step of the first movement that cannot be made,
+#'goal' if every movement can be made but the plan does not finish at the goal, or None if the plan is valid.
+def replayPlan(initialStructure, goalStructure, array):
+
+    structure = np.copy(initialStructure)
+    hold = set()
+    shape = structure.shape
+
+    for stepNo in range(np.shape(array)[1]):
+        movement = [int(i) for i in array[:, stepNo]]
+        moduleID = movement[mrt.ID]
+        oldLocation = None if movement[mrt.OLD_HOLD] == 1 else tuple(movement[mrt.OLD_Z:mrt.OLD_Y+1])
+        newLocation = None if movement[mrt.NEW_HOLD] == 1 else tuple(movement[mrt.NEW_Z:mrt.NEW_Y+1])
+
+        for location in (oldLocation, newLocation):
+            if location != None and not all(0 <= location[axis] < shape[axis] for axis in range(3)):
+                return stepNo
+        if moduleID <= 0:
+            return stepNo
+
+        if oldLocation == None:
+            if moduleID not in hold:
+                return stepNo
+            hold.remove(moduleID)
+        else:
+            if structure[oldLocation] != moduleID:
+                return stepNo
+            structure[oldLocation] = 0
+
+        if newLocation == None:
+            hold.add(moduleID)
+        else:
+            if structure[newLocation] != 0:
+                return stepNo
+            structure[newLocation] = moduleID
+
+    if len(hold) > 0 or not np.array_equal(structure, goalStructure):
+        return 'goal'
+    return None
+
+#Corrupt a copy of a log array in one of six ways: moving a location, changing a module ID, removing a movement,
+#flipping a hold flag, shuffling the movements or cutting the plan short.
+def corruptPlan(rng, array, noOfModules):
+
+    array = np.copy(array)
+    noOfSteps = np.shape(array)[1]
+    stepNo = rng.integers(noOfSteps)
+    corruption = rng.integers(6)
+
+    if corruption == 0:
+        array[rng.integers(mrt.OLD_Z, mrt.NEW_Y+1), stepNo] += rng.choice([-1, 1, 5])
+    elif corruption == 1:
+        array[mrt.ID, stepNo] = rng.integers(1, noOfModules+2)
+    elif corruption == 2:
+        array = np.delete(array, stepNo, axis=1)
+    elif corruption == 3:
+        array[rng.choice([mrt.OLD_HOLD, mrt.NEW_HOLD]), stepNo] ^= 1
+    elif corruption == 4:
+        array = array[:, rng.permutation(noOfSteps)]
+    else:
+        array = array[:, :stepNo]
+
+    return array
+
+#The validator and the replay find the same first fault, or none, in plans and corrupted copies of them.
+@pytest.mark.parametrize('seed', range(5))
+def testValidatorAgreesWithReplay(seed):
+
+    rng = np.random.default_rng(seed)
+    kindNames = list(sg.kinds)
+
+    for planNo in range(6):
+        noOfModules = int(rng.integers(3, 9))
+        kind = kindNames[rng.integers(len(kindNames))]
+        initialStructure, goalStructure = sg.generatePair(kind, noOfModules, 8, (seed, planNo))
+
+        meltSuccsessful, movements = msg.main(initialStructure, goalStructure)
+        array = np.array(movements.getMovements().getArray())
+        assert replayPlan(initialStructure, goalStructure, array) == None
+
+        for plan in [array] + [corruptPlan(rng, array, noOfModules) for corruptionNo in range(8)]:
+            result = pv.validatePlan(initialStructure, goalStructure, plan)
+            found = None
+            if result.valid == False:
+                found = result.stepNo if result.stepNo != None else 'goal'
+            assert found == replayPlan(initialStructure, goalStructure, plan), result.message
+
+#Plans can be given as movements or arrays, between dense or sparse structures.
+def testValidatorTakesMovementsAndSparseStructures():
+
+    initialStructure, goalStructure = sg.generatePair('blob', 8, 8, seed=2)
+    meltSuccsessful, movements = msg.main(initialStructure, goalStructure)
+
+    assert pv.validatePlan(initialStructure, goalStructure, movements).valid
+    assert pv.validatePlan(mrt.getSparseStructure(initialStructure), mrt.getSparseStructure(goalStructure), movements).valid
+    assert pv.validatePlan(initialStructure, initialStructure, mrt.Movements()).valid
+    assert pv.validatePlan(initialStructure, goalStructure, mrt.Movements()).valid == False